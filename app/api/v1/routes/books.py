@@ -1,26 +1,142 @@
+from typing import Annotated
+
+from app.core.etag import entity_etag, etag_matches, not_modified
+from app.core.lookup import lookup_response, parse_ids
+from app.core.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_offset,
+    next_cursor,
+    next_offset_cursor,
+)
 from app.dependencies.auth import librarian_id
-from app.dependencies.db import db
-from app.schemas.book import BookIn, BookOut, BookPatch
+from app.dependencies.db import db, read_db, read_session_maker
+from app.schemas.book import (
+    BookImportReport,
+    BookIn,
+    BookLookupOut,
+    BookOut,
+    BookPatch,
+    BookSort,
+    book_serializer,
+)
+from app.schemas.lookup import LookupIn
+from app.services.book_import_service import ImportFormat, import_books, iter_records
 from app.services.book_service import (
+    BOOK_SORT_COLUMNS,
+    book_fields,
+    book_page_etag,
     create_book,
     delete_book,
-    get_book_by_id,
     list_books,
+    lookup_books,
+    read_book,
+    search_books,
     update_book,
 )
-from fastapi import APIRouter, status
+from app.services.export_service import EXPORT_MEDIA_TYPES, ExportFormat, export_books
+from fastapi import APIRouter, Header, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 
 router = APIRouter(prefix="/books", tags=["books"])
 
 
 @router.get("/", response_model=list[BookOut], status_code=status.HTTP_200_OK)
-async def read_books(session: db, librarian_id: librarian_id) -> list[BookOut]:
-    return await list_books(session)
+async def read_books(
+    response: Response,
+    session: read_db,
+    librarian_id: librarian_id,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    after: str | None = None,
+    sort: BookSort = "id",
+    fields: str | None = None,
+    ids: str | None = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> list[BookOut]:
+    sort_columns = BOOK_SORT_COLUMNS[sort]
+    field_set = book_fields.parse(fields, required=[column.key for column in sort_columns])
+    if ids is not None:
+        books, missing = await lookup_books(session, parse_ids(ids), fields=field_set)
+        if missing:
+            response.headers["X-Missing-Ids"] = ",".join(map(str, missing))
+        return field_set.list_serializer.response(books, headers=response.headers, trusted=True)
+    etag = await book_page_etag(session, limit=limit, after=after, sort=sort)
+    if field_set is not book_fields.all:
+        etag = field_set.etag(etag)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    books = await list_books(session, limit=limit, after=after, sort=sort, fields=field_set)
+    cursor = next_cursor(books, sort_columns, sort=sort, limit=limit)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
+    response.headers["ETag"] = etag
+    return field_set.list_serializer.response(books, headers=response.headers, trusted=True)
+
+
+@router.get("/search", response_model=list[BookOut], status_code=status.HTTP_200_OK)
+async def search_books_endpoint(
+    response: Response,
+    session: read_db,
+    librarian_id: librarian_id,
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    after: str | None = None,
+    fields: str | None = None,
+) -> list[BookOut]:
+    field_set = book_fields.parse(fields)
+    offset = decode_offset(after, "rank")
+    books = await search_books(session, q, limit=limit, offset=offset, fields=field_set)
+    cursor = next_offset_cursor(books, sort="rank", limit=limit, offset=offset)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
+    return field_set.list_serializer.response(books, headers=response.headers, trusted=True)
+
+
+@router.post("/lookup", response_model=BookLookupOut, status_code=status.HTTP_200_OK)
+async def lookup_books_endpoint(
+    data: LookupIn,
+    session: read_db,
+    librarian_id: librarian_id,
+    fields: str | None = None,
+) -> BookLookupOut:
+    field_set = book_fields.parse(fields, required=["id"])
+    books, missing = await lookup_books(session, data.ids, fields=field_set)
+    return lookup_response(field_set, books, missing)
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def export_books_endpoint(
+    sessions: read_session_maker,
+    librarian_id: librarian_id,
+    fmt: Annotated[ExportFormat, Query(alias="format")] = "ndjson",
+) -> StreamingResponse:
+    return StreamingResponse(
+        export_books(sessions, fmt),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="books.{fmt}"'},
+    )
 
 
 @router.get("/{book_id}", response_model=BookOut, status_code=status.HTTP_200_OK)
-async def get_book(book_id: int, session: db, librarian_id: librarian_id) -> BookOut:
-    return await get_book_by_id(session, book_id)
+async def get_book(
+    book_id: int,
+    session: db,
+    librarian_id: librarian_id,
+    fields: str | None = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> BookOut:
+    field_set = book_fields.parse(fields)
+    book = await read_book(session, book_id)
+    etag = entity_etag(book.id, book.version, book.copies_count)
+    if field_set is not book_fields.all:
+        etag = field_set.etag(etag)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    return book_serializer.response(
+        book, headers={"ETag": etag}, trusted=True, include=field_set.include
+    )
 
 
 @router.post("/", response_model=BookOut, status_code=status.HTTP_201_CREATED)
@@ -28,6 +144,16 @@ async def create_new_book(book: BookIn, session: db, librarian_id: librarian_id)
     return await create_book(session, book)
 
 
+@router.post("/import", response_model=BookImportReport, status_code=status.HTTP_200_OK)
+async def import_books_endpoint(
+    request: Request,
+    session: db,
+    librarian_id: librarian_id,
+    fmt: Annotated[ImportFormat, Query(alias="format")] = "csv",
+) -> BookImportReport:
+    return await import_books(session, iter_records(request.stream(), fmt))
+
+
 @router.put("/{book_id}", response_model=BookOut, status_code=status.HTTP_200_OK)
 async def update_existing_book(
     book_id: int, book: BookIn, session: db, librarian_id: librarian_id
@@ -1,9 +1,29 @@
+from typing import Annotated
+
 from app.dependencies.auth import librarian_id
-from app.dependencies.db import db
+from app.dependencies.db import db, read_db, read_session_maker
 from app.schemas.book import BookOut
-from app.schemas.borrow import BorrowedBookOut, BorrowRequest
-from app.services.borrow_service import borrow_book, get_active_borrowed_books, return_book
-from fastapi import APIRouter, status
+from app.schemas.borrow import (
+    BorrowBatchItemOut,
+    BorrowBatchRequest,
+    BorrowedBookOut,
+    BorrowRequest,
+)
+from app.services.book_service import book_fields
+from app.services.borrow_service import (
+    borrow_book,
+    borrow_books,
+    get_active_borrowed_books,
+    return_book,
+    return_books,
+)
+from app.services.export_service import (
+    EXPORT_MEDIA_TYPES,
+    ExportFormat,
+    export_borrow_history,
+)
+from fastapi import APIRouter, Query, status
+from fastapi.responses import StreamingResponse
 
 router = APIRouter(prefix="/borrow", tags=["borrow"])
 
@@ -21,10 +41,40 @@ async def return_borrowed_book(data: BorrowRequest, session: db, librarian_id: l
     return {"detail": "Book returned successfully"}
 
 
+@router.post("/batch", response_model=list[BorrowBatchItemOut], status_code=status.HTTP_200_OK)
+async def borrow_books_endpoint(
+    data: BorrowBatchRequest, session: db, librarian_id: librarian_id
+) -> list[BorrowBatchItemOut]:
+    return await borrow_books(session, data.items, data.mode)
+
+
+@router.post(
+    "/return/batch", response_model=list[BorrowBatchItemOut], status_code=status.HTTP_200_OK
+)
+async def return_borrowed_books(
+    data: BorrowBatchRequest, session: db, librarian_id: librarian_id
+) -> list[BorrowBatchItemOut]:
+    return await return_books(session, data.items, data.mode)
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def export_borrow_history_endpoint(
+    sessions: read_session_maker,
+    librarian_id: librarian_id,
+    fmt: Annotated[ExportFormat, Query(alias="format")] = "ndjson",
+) -> StreamingResponse:
+    return StreamingResponse(
+        export_borrow_history(sessions, fmt),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="borrow_history.{fmt}"'},
+    )
+
+
 @router.get("/{user_id}", response_model=list[BookOut], status_code=status.HTTP_200_OK)
 async def list_borrowed_books_by_user(
     user_id: int,
-    session: db,
+    session: read_db,
     librarian_id: librarian_id,
 ) -> list[BookOut]:
-    return await get_active_borrowed_books(session, user_id)
+    books = await get_active_borrowed_books(session, user_id)
+    return book_fields.all.list_serializer.response(books, trusted=True)
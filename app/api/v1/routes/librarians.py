@@ -1,7 +1,15 @@
-from app.dependencies.auth import form_data
+from datetime import datetime, timezone
+
+from app.dependencies.auth import form_data, token_claims
 from app.dependencies.db import db
-from app.schemas.librarian import LibrarianIn, LibrarianOut, TokenOut
-from app.services.librarian_service import authenticate_librarian, register_librarian
+from app.schemas.librarian import LibrarianIn, LibrarianOut, LogoutIn, RefreshIn, TokenOut
+from app.services.librarian_service import (
+    authenticate_librarian,
+    refresh_access_token,
+    register_librarian,
+    revoke_refresh_token,
+)
+from app.services.token_revocation_service import revoke_token
 from fastapi import APIRouter, status
 
 router = APIRouter(prefix="/librarians", tags=["librarians"])
@@ -15,3 +23,17 @@ async def register(data: LibrarianIn, session: db) -> LibrarianOut:
 @router.post("/login", response_model=TokenOut, status_code=status.HTTP_200_OK)
 async def login(form_data: form_data, session: db) -> TokenOut:
     return await authenticate_librarian(form_data.username, form_data.password, session)
+
+
+@router.post("/refresh", response_model=TokenOut, status_code=status.HTTP_200_OK)
+async def refresh(data: RefreshIn, session: db) -> TokenOut:
+    return await refresh_access_token(data.refresh_token, session)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(claims: token_claims, session: db, data: LogoutIn | None = None):
+    if "jti" in claims:
+        expires_at = datetime.fromtimestamp(claims["exp"], tz=timezone.utc)
+        await revoke_token(session, claims["jti"], expires_at)
+    if data is not None and data.refresh_token is not None:
+        await revoke_refresh_token(data.refresh_token, session)
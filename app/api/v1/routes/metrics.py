@@ -0,0 +1,11 @@
+from app.core.metrics import registry
+from app.dependencies.auth import librarian_id
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/", response_class=PlainTextResponse)
+async def read_metrics(librarian_id: librarian_id) -> PlainTextResponse:
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
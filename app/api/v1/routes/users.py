@@ -1,26 +1,114 @@
+from typing import Annotated
+
+from app.core.etag import entity_etag, etag_matches, not_modified
+from app.core.lookup import lookup_response, parse_ids
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, next_cursor
 from app.dependencies.auth import librarian_id
-from app.dependencies.db import db
-from app.schemas.user import UserIn, UserOut, UserPatch
+from app.dependencies.db import db, read_db, read_session_maker
+from app.schemas.lookup import LookupIn
+from app.schemas.user import (
+    UserIn,
+    UserLookupOut,
+    UserOut,
+    UserPatch,
+    UserSort,
+    user_serializer,
+)
+from app.services.export_service import EXPORT_MEDIA_TYPES, ExportFormat, export_users
 from app.services.user_service import (
+    USER_SORT_COLUMNS,
     create_user,
     delete_user,
-    get_user_by_id,
     list_users,
+    lookup_users,
+    read_user,
     update_user,
+    user_fields,
+    user_page_etag,
 )
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Header, Query, Response, status
+from fastapi.responses import StreamingResponse
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/", response_model=list[UserOut], status_code=status.HTTP_200_OK)
-async def read_users(session: db, librarian_id: librarian_id) -> list[UserOut]:
-    return await list_users(session)
+async def read_users(
+    response: Response,
+    session: read_db,
+    librarian_id: librarian_id,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    after: str | None = None,
+    sort: UserSort = "id",
+    fields: str | None = None,
+    ids: str | None = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> list[UserOut]:
+    sort_columns = USER_SORT_COLUMNS[sort]
+    field_set = user_fields.parse(fields, required=[column.key for column in sort_columns])
+    if ids is not None:
+        users, missing = await lookup_users(session, parse_ids(ids), fields=field_set)
+        if missing:
+            response.headers["X-Missing-Ids"] = ",".join(map(str, missing))
+        return field_set.list_serializer.response(users, headers=response.headers, trusted=True)
+    etag = await user_page_etag(session, limit=limit, after=after, sort=sort)
+    if field_set is not user_fields.all:
+        etag = field_set.etag(etag)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    users = await list_users(session, limit=limit, after=after, sort=sort, fields=field_set)
+    cursor = next_cursor(users, sort_columns, sort=sort, limit=limit)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
+    response.headers["ETag"] = etag
+    return field_set.list_serializer.response(users, headers=response.headers, trusted=True)
+
+
+@router.post("/lookup", response_model=UserLookupOut, status_code=status.HTTP_200_OK)
+async def lookup_users_endpoint(
+    data: LookupIn,
+    session: read_db,
+    librarian_id: librarian_id,
+    fields: str | None = None,
+) -> UserLookupOut:
+    field_set = user_fields.parse(fields, required=["id"])
+    users, missing = await lookup_users(session, data.ids, fields=field_set)
+    return lookup_response(field_set, users, missing)
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def export_users_endpoint(
+    sessions: read_session_maker,
+    librarian_id: librarian_id,
+    fmt: Annotated[ExportFormat, Query(alias="format")] = "ndjson",
+) -> StreamingResponse:
+    return StreamingResponse(
+        export_users(sessions, fmt),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="users.{fmt}"'},
+    )
 
 
 @router.get("/{user_id}", response_model=UserOut, status_code=status.HTTP_200_OK)
-async def get_user(user_id: int, session: db, librarian_id: librarian_id) -> UserOut:
-    return await get_user_by_id(session, user_id)
+async def get_user(
+    user_id: int,
+    session: db,
+    librarian_id: librarian_id,
+    fields: str | None = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> UserOut:
+    field_set = user_fields.parse(fields)
+    user = await read_user(session, user_id)
+    etag = entity_etag(user.id, user.version)
+    if field_set is not user_fields.all:
+        etag = field_set.etag(etag)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    return user_serializer.response(
+        user, headers={"ETag": etag}, trusted=True, include=field_set.include
+    )
 
 
 @router.post("/", response_model=UserOut, status_code=status.HTTP_201_CREATED)
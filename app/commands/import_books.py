@@ -0,0 +1,35 @@
+"""Bulk-load books from a CSV or NDJSON file.
+
+Usage: python -m app.commands.import_books books.csv [--format csv|ndjson]
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator
+
+from app.db.database import async_session_maker
+from app.services.book_import_service import import_books, iter_records
+
+READ_SIZE = 1024 * 1024
+
+
+async def read_file(path: Path) -> AsyncIterator[bytes]:
+    with path.open("rb") as file:
+        while chunk := await asyncio.to_thread(file.read, READ_SIZE):
+            yield chunk
+
+
+async def main(path: Path, fmt: str) -> None:
+    async with async_session_maker() as session:
+        report = await import_books(session, iter_records(read_file(path), fmt))
+    print(report.model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import books into the catalogue.")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default=None)
+    args = parser.parse_args()
+    fmt = args.format or ("ndjson" if args.path.suffix in (".ndjson", ".jsonl") else "csv")
+    asyncio.run(main(args.path, fmt))
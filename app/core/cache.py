@@ -0,0 +1,326 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Protocol
+from urllib.parse import urlparse
+
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge, registry
+
+logger = logging.getLogger(__name__)
+
+cache_requests = registry.register(
+    Counter(
+        "cache_requests_total", "Cache lookups by namespace and result.", ["namespace", "result"]
+    )
+)
+cache_evictions = registry.register(
+    Counter("cache_evictions_total", "Entries evicted to respect the cache size limits.")
+)
+
+
+# Invalidated keys hold this marker for ``INVALIDATION_TTL_SECONDS``; see ``Cache``.
+TOMBSTONE = b""
+INVALIDATION_TTL_SECONDS = 5
+
+
+class LRUCache:
+    """In-process LRU with per-entry TTL, bounded by entry count and total entry size."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.size = 0
+        self._entries: OrderedDict[Any, tuple[Any, float | None, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Any) -> bool:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        expires_at = entry[1]
+        if expires_at is not None and expires_at <= self.clock():
+            self.delete(key)
+            return False
+        return True
+
+    def get(self, key: Any) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, _ = entry
+        if expires_at is not None and expires_at <= self.clock():
+            self.delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Any, value: Any, ttl: float | None = None, size: int = 0) -> None:
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self.delete(key)
+        expires_at = self.clock() + ttl if ttl is not None else None
+        self._entries[key] = (value, expires_at, size)
+        self.size += size
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self.size > self.max_bytes
+        ):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self.size -= evicted_size
+            cache_evictions.inc()
+
+    def delete(self, key: Any) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[2]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+
+class CacheBackend(Protocol):
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    async def add(self, key: str, value: bytes, ttl: float) -> None:
+        """Like :meth:`set`, but only when ``key`` holds no value."""
+        ...
+
+    async def delete(self, *keys: str) -> None: ...
+
+    async def clear(self) -> None: ...
+
+
+class NullBackend:
+    async def get(self, key: str) -> bytes | None:
+        return None
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        pass
+
+    async def add(self, key: str, value: bytes, ttl: float) -> None:
+        pass
+
+    async def delete(self, *keys: str) -> None:
+        pass
+
+    async def clear(self) -> None:
+        pass
+
+
+class MemoryBackend:
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.lru = LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+
+    async def get(self, key: str) -> bytes | None:
+        return self.lru.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.lru.set(key, value, ttl=ttl, size=len(key) + len(value))
+
+    async def add(self, key: str, value: bytes, ttl: float) -> None:
+        if key not in self.lru:
+            await self.set(key, value, ttl)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.lru.delete(key)
+
+    async def clear(self) -> None:
+        self.lru.clear()
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisBackend:
+    """Minimal RESP client for GET/SET/DEL against Redis or any protocol-compatible server.
+
+    Commands are serialized over one connection per worker. Connection failures,
+    error replies and commands that exceed ``timeout`` are logged and treated as
+    misses so the database remains the source of truth. Any interrupted command,
+    cancellation included, drops the connection: a reply left unread on it would
+    otherwise be taken as the answer to the next command.
+    """
+
+    def __init__(self, url: str, prefix: str = "library:", timeout: float = 0.5):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.database = int(parsed.path.lstrip("/") or 0)
+        self.prefix = prefix
+        self.timeout = timeout
+        self._lock = asyncio.Lock()
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+
+    @staticmethod
+    def _encode(*args: str | bytes | int) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    async def _read_reply(self) -> Any:
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by cache server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload
+        if kind == b"-":
+            raise RedisError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            if length == -1:
+                return None
+            return [await self._read_reply() for _ in range(length)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            await self._send("AUTH", self.password)
+        if self.database:
+            await self._send("SELECT", self.database)
+
+    async def _send(self, *args: str | bytes | int) -> Any:
+        self._writer.write(self._encode(*args))
+        await self._writer.drain()
+        return await self._read_reply()
+
+    async def execute(self, *args: str | bytes | int) -> Any:
+        async with self._lock:
+            try:
+                if self._writer is None:
+                    await asyncio.wait_for(self._connect(), self.timeout)
+                return await asyncio.wait_for(self._send(*args), self.timeout)
+            except (
+                OSError,
+                ConnectionError,
+                asyncio.IncompleteReadError,
+                asyncio.TimeoutError,
+                RedisError,
+            ) as exc:
+                logger.warning("Cache server unavailable: %r", exc)
+                await self.close()
+                return None
+            except BaseException:
+                await self.close()
+                raise
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.execute("GET", self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.execute("SET", self.prefix + key, value, "PX", int(ttl * 1000))
+
+    async def add(self, key: str, value: bytes, ttl: float) -> None:
+        await self.execute("SET", self.prefix + key, value, "PX", int(ttl * 1000), "NX")
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.execute("DEL", *(self.prefix + key for key in keys))
+
+    async def clear(self) -> None:
+        cursor = b"0"
+        while True:
+            reply = await self.execute("SCAN", cursor, "MATCH", self.prefix + "*", "COUNT", 1000)
+            if not reply:
+                return
+            cursor, keys = reply
+            if keys:
+                await self.execute("DEL", *keys)
+            if cursor == b"0":
+                return
+
+
+class Cache:
+    """Read-through cache of serialized values, keyed as ``<namespace>:<id>``.
+
+    Invalidation leaves a short-lived tombstone instead of removing the key, and fills
+    only store into keys that hold nothing. A miss that read the row before a concurrent
+    write committed therefore cannot put the old row back after the write invalidated
+    it, as long as the read finishes within ``INVALIDATION_TTL_SECONDS``.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+
+    async def get(self, key: str) -> bytes | None:
+        value = await self.backend.get(key)
+        if value == TOMBSTONE:
+            value = None
+        namespace = key.split(":", 1)[0]
+        cache_requests.inc(namespace=namespace, result="miss" if value is None else "hit")
+        return value
+
+    async def fill(self, key: str, value: bytes) -> None:
+        """Store a value read after a miss, unless ``key`` was invalidated meanwhile."""
+        await self.backend.add(key, value, self.ttl)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            await self.backend.set(key, TOMBSTONE, INVALIDATION_TTL_SECONDS)
+
+    async def clear(self) -> None:
+        await self.backend.clear()
+
+
+def build_cache_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == "redis":
+        return RedisBackend(settings.CACHE_REDIS_URL, timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS)
+    if settings.CACHE_BACKEND == "memory":
+        return MemoryBackend(settings.CACHE_MAX_ENTRIES, settings.CACHE_MAX_BYTES)
+    return NullBackend()
+
+
+def cache_ttl() -> float:
+    """Writes only invalidate the memory backend of the worker that handled them, so
+    with several workers its TTL is how long the others may serve a stale entry.
+    """
+    if settings.CACHE_BACKEND == "memory":
+        return settings.CACHE_MEMORY_TTL_SECONDS
+    return settings.CACHE_TTL_SECONDS
+
+
+cache = Cache(build_cache_backend(), ttl=cache_ttl())
+
+
+def _memory_usage() -> dict[tuple, float]:
+    if isinstance(cache.backend, MemoryBackend):
+        return {("entries",): len(cache.backend.lru), ("bytes",): cache.backend.lru.size}
+    return {}
+
+
+registry.register(
+    Gauge("cache_memory_usage", "In-process cache size.", ["unit"], callback=_memory_usage)
+)
@@ -0,0 +1,262 @@
+import logging
+import zlib
+from typing import Any, Callable, Iterable, Protocol
+
+from app.core.metrics import Counter, registry
+
+# Both are pinned in requirements.txt; the fallback keeps gzip working in environments
+# installed without them, and ``available_encoders`` logs what is missing.
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_TYPES = frozenset(
+    {
+        "application/json",
+        "application/x-ndjson",
+        "application/xml",
+        "application/javascript",
+        "image/svg+xml",
+    }
+)
+NO_BODY_STATUSES = frozenset({204, 304})
+
+compressed_responses = registry.register(
+    Counter(
+        "http_compressed_responses_total",
+        "Responses by negotiated content encoding; identity means sent uncompressed.",
+        ["encoding"],
+    )
+)
+compressed_bytes = registry.register(
+    Counter(
+        "http_compressed_bytes_total",
+        "Body bytes of compressed responses before and after compression.",
+        ["encoding", "stage"],
+    )
+)
+
+
+class Encoder(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes:
+        """Everything compressed so far, without ending the stream."""
+        ...
+
+    def finish(self) -> bytes: ...
+
+
+class GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def available_encoders(
+    encodings: Iterable[str], gzip_level: int, brotli_quality: int, zstd_level: int
+) -> dict[str, Callable[[], Encoder]]:
+    """Encoder factories in server preference order, skipping codecs that are not installed."""
+    factories = {
+        "zstd": (zstandard, "zstandard", lambda: ZstdEncoder(zstd_level)),
+        "br": (brotli, "brotli", lambda: BrotliEncoder(brotli_quality)),
+        "gzip": (zlib, "zlib", lambda: GzipEncoder(gzip_level)),
+    }
+    encoders = {}
+    for encoding in encodings:
+        module, package, factory = factories[encoding]
+        if module is None:
+            logger.warning("%s compression is disabled: %s is not installed", encoding, package)
+            continue
+        encoders[encoding] = factory
+    return encoders
+
+
+def negotiate(accept_encoding: str, supported: Iterable[str]) -> str | None:
+    """Pick the supported coding with the highest ``q``; ties go to the server's order."""
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+
+    best, best_weight = None, 0.0
+    for coding in supported:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type.endswith("+json")
+        or media_type in COMPRESSIBLE_TYPES
+    )
+
+
+class CompressionMiddleware:
+    """Compresses text-like responses with the best coding the client accepts.
+
+    Complete bodies smaller than ``minimum_size`` go out as they are, since compressing
+    a few hundred bytes of JSON costs more CPU than it saves on the wire. Streaming
+    bodies are compressed and flushed chunk by chunk, without a ``Content-Length``,
+    so each chunk reaches the client as soon as it is produced. Strong ETags are
+    weakened on compressed responses because the bytes differ per coding.
+    """
+
+    def __init__(
+        self,
+        app,
+        encoders: dict[str, Callable[[], Encoder]],
+        minimum_size: int = 1024,
+    ):
+        self.app = app
+        self.encoders = encoders
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: dict[str, Any], receive, send):
+        if scope["type"] != "http" or not self.encoders:
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate(accept_encoding, self.encoders)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: dict[str, Any] | None = None
+        encoder: Encoder | None = None
+        original_size = 0
+
+        async def send_compressed(message):
+            nonlocal start, encoder, original_size
+            if message["type"] == "http.response.start":
+                headers = {name.lower(): value for name, value in message.get("headers", [])}
+                if (
+                    message["status"] in NO_BODY_STATUSES
+                    or b"content-encoding" in headers
+                    or not is_compressible(headers.get(b"content-type", b"").decode("latin-1"))
+                ):
+                    start = None
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            if message["type"] != "http.response.body" or (start is None and encoder is None):
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                if not more_body and len(body) < self.minimum_size:
+                    compressed_responses.inc(encoding="identity")
+                    await send(start)
+                    await send(message)
+                    start = None
+                    return
+                encoder = self.encoders[encoding]()
+                compressed_responses.inc(encoding=encoding)
+
+            original_size += len(body)
+            chunk = encoder.compress(body)
+            if not more_body:
+                chunk += encoder.finish()
+                compressed_bytes.inc(original_size, encoding=encoding, stage="original")
+            elif body:
+                chunk += encoder.flush()
+            compressed_bytes.inc(len(chunk), encoding=encoding, stage="compressed")
+            if start is not None:
+                length = None if more_body else len(chunk)
+                await send(self._compressed_start(start, encoding, length))
+                start = None
+            if chunk or not more_body:
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _compressed_start(
+        message: dict[str, Any], encoding: str, length: int | None
+    ) -> dict[str, Any]:
+        headers = []
+        vary = []
+        for name, value in message.get("headers", []):
+            lowered = name.lower()
+            if lowered == b"content-length":
+                continue
+            if lowered == b"vary":
+                vary.append(value)
+                continue
+            if lowered == b"etag" and not value.startswith(b"W/"):
+                value = b"W/" + value
+            headers.append((name, value))
+        vary.append(b"Accept-Encoding")
+        headers.append((b"vary", b", ".join(vary)))
+        headers.append((b"content-encoding", encoding.encode()))
+        if length is not None:
+            headers.append((b"content-length", str(length).encode()))
+        return {**message, "headers": headers}
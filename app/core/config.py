@@ -1,3 +1,5 @@
+from typing import Literal
+
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -10,16 +12,58 @@ class Settings(BaseSettings):
     POSTGRES_DB_USER: str
     POSTGRES_DB_PASS: str
     POSTGRES_DB_NAME: str
+    POSTGRES_REPLICA_HOSTS: list[str] = []
 
     TEST_POSTGRES_DB_HOST: str
     TEST_POSTGRES_DB_PORT: int
     TEST_POSTGRES_DB_USER: str
     TEST_POSTGRES_DB_PASS: str
     TEST_POSTGRES_DB_NAME: str
+    TEST_POSTGRES_REPLICA_HOSTS: list[str] = []
 
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    JWT_CACHE_MAX_ENTRIES: int = 10_000
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    REFRESH_TOKEN_CACHE_MAX_ENTRIES: int = 4096
+    TOKEN_REVOCATION_FILTER_CAPACITY: int = 100_000
+    TOKEN_REVOCATION_FILTER_ERROR_RATE: float = 0.001
+    TOKEN_REVOCATION_REFRESH_SECONDS: float = 5
+
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = False
+    DB_PGBOUNCER: bool = False
+    SLOW_QUERY_THRESHOLD_SECONDS: float | None = 0.5
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.0
+    SLOW_QUERY_EXPLAIN_FILE: str = "logs/slow_queries.log"
+    SLOW_QUERY_EXPLAIN_MAX_BYTES: int = 10 * 1024 * 1024
+    SLOW_QUERY_EXPLAIN_BACKUPS: int = 5
+    REPLICA_MAX_LAG_SECONDS: float = 5
+    REPLICA_CHECK_INTERVAL_SECONDS: float = 5
+    REPLICA_STICKY_SECONDS: float = 5
+
+    CACHE_BACKEND: Literal["memory", "redis", "none"] = "memory"
+    CACHE_TTL_SECONDS: float = 60
+    CACHE_MEMORY_TTL_SECONDS: float = 2
+    CACHE_MAX_ENTRIES: int = 10_000
+    CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_REDIS_TIMEOUT_SECONDS: float = 0.5
+
+    COMPRESSION_ENCODINGS: list[Literal["zstd", "br", "gzip"]] = ["zstd", "br", "gzip"]
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+
+    BOOK_COPY_SHARDS: int = 1
+
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
 
     @property
     def TEST_POSTGRES_URL_ASYNC(self):
@@ -29,6 +73,20 @@ class Settings(BaseSettings):
     def POSTGRES_URL_ASYNC(self):
         return f"postgresql+asyncpg://{self.POSTGRES_DB_USER}:{self.POSTGRES_DB_PASS}@{self.POSTGRES_DB_HOST}:{self.POSTGRES_DB_PORT}/{self.POSTGRES_DB_NAME}"
 
+    @property
+    def TEST_POSTGRES_REPLICA_URLS_ASYNC(self):
+        return [
+            f"postgresql+asyncpg://{self.TEST_POSTGRES_DB_USER}:{self.TEST_POSTGRES_DB_PASS}@{host}/{self.TEST_POSTGRES_DB_NAME}"
+            for host in self.TEST_POSTGRES_REPLICA_HOSTS
+        ]
+
+    @property
+    def POSTGRES_REPLICA_URLS_ASYNC(self):
+        return [
+            f"postgresql+asyncpg://{self.POSTGRES_DB_USER}:{self.POSTGRES_DB_PASS}@{host}/{self.POSTGRES_DB_NAME}"
+            for host in self.POSTGRES_REPLICA_HOSTS
+        ]
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
 
@@ -0,0 +1,57 @@
+from typing import Sequence
+
+from fastapi import Response, status
+from sqlalchemy import ColumnElement, func, literal, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.core.pagination import paginate
+
+
+def entity_etag(*parts: object) -> str:
+    tag = "-".join(str(part) for part in parts)
+    return f'"{tag}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """``If-None-Match`` uses weak comparison, so ``W/`` prefixes are ignored."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+async def page_etag(
+    session: AsyncSession,
+    model: type,
+    columns: Sequence[InstrumentedAttribute],
+    *,
+    sort: str,
+    limit: int,
+    after: str | None = None,
+    fingerprint: Sequence[ColumnElement] = (),
+) -> str:
+    """ETag of a keyset page, computed from the ``(id, version)`` pairs it contains.
+
+    Any insert, delete or versioned update that touches the page changes the digest,
+    while the rows themselves are never loaded or serialized. ``fingerprint`` adds
+    columns that can change without a version bump.
+    """
+    page = paginate(
+        select(model.id, model.version, *fingerprint),
+        columns,
+        sort=sort,
+        limit=limit,
+        after=after,
+    ).subquery()
+    pair = func.concat_ws(":", *page.c)
+    pairs = func.string_agg(pair, aggregate_order_by(literal(","), page.c.id))
+    digest = await session.scalar(select(func.md5(func.coalesce(pairs, ""))))
+    return f'"{digest}"'
@@ -0,0 +1,80 @@
+from dataclasses import fields as dataclass_fields
+from dataclasses import make_dataclass
+from typing import Any, Iterable, Mapping, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import ColumnElement
+
+from app.core.serialization import JSONSerializer
+
+
+class FieldSet:
+    """One projection of a resource: its SQL columns, row type and list serializer."""
+
+    def __init__(self, names: tuple[str, ...], columns: Sequence[ColumnElement], row_type: type):
+        self.names = names
+        self.columns = tuple(columns)
+        self.row_type = row_type
+        self.include = set(names)
+        self.list_serializer = JSONSerializer(list[row_type])
+
+    def rows(self, result: Iterable[Sequence[Any]]) -> list[Any]:
+        row_type = self.row_type
+        return [row_type(*row) for row in result]
+
+    def etag(self, etag: str) -> str:
+        """Representations differ per field set, so their validators must too."""
+        return f'{etag[:-1]};{",".join(self.names)}"'
+
+
+class FieldSelector:
+    """Parses ``fields=`` for one resource into cached :class:`FieldSet` objects.
+
+    ``fields`` is a comma-separated list of field names and preset names. Each distinct
+    projection builds its slotted row dataclass and ``TypeAdapter`` once.
+    """
+
+    def __init__(
+        self,
+        row_type: type,
+        columns: Sequence[ColumnElement],
+        presets: Mapping[str, Sequence[str]],
+    ):
+        self.field_types = {field.name: field.type for field in dataclass_fields(row_type)}
+        self.columns = dict(zip(self.field_types, columns))
+        self.presets = presets
+        self.all = FieldSet(tuple(self.field_types), columns, row_type)
+        self._cache: dict[tuple[str, ...], FieldSet] = {self.all.names: self.all}
+        self._row_type_name = row_type.__name__
+
+    def parse(self, raw: str | None, required: Iterable[str] = ()) -> FieldSet:
+        """``required`` fields, such as sort keys a cursor is built from, are always kept."""
+        if not raw:
+            return self.all
+        requested = set(required)
+        for token in filter(None, (part.strip() for part in raw.split(","))):
+            if token in self.presets:
+                requested.update(self.presets[token])
+            elif token in self.field_types:
+                requested.add(token)
+            else:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Unknown field: {token}",
+                )
+        names = tuple(name for name in self.field_types if name in requested)
+        if not names:
+            return self.all
+        return self._field_set(names)
+
+    def _field_set(self, names: tuple[str, ...]) -> FieldSet:
+        field_set = self._cache.get(names)
+        if field_set is None:
+            row_type = make_dataclass(
+                f"{self._row_type_name}_{'_'.join(names)}",
+                [(name, self.field_types[name]) for name in names],
+                slots=True,
+            )
+            columns = [self.columns[name] for name in names]
+            field_set = self._cache[names] = FieldSet(names, columns, row_type)
+        return field_set
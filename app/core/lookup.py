@@ -0,0 +1,43 @@
+from typing import Any, Sequence
+
+import orjson
+from fastapi import HTTPException, Response, status
+
+from app.core.fields import FieldSet
+
+MAX_LOOKUP_IDS = 500
+MAX_ID = 2**31 - 1
+
+
+def parse_ids(raw: str) -> list[int]:
+    """Parse ``ids=1,2,3``; every id must fit the ``integer`` primary key."""
+    invalid_ids = HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ids")
+    try:
+        ids = [int(part) for part in raw.split(",") if part.strip()]
+    except ValueError:
+        raise invalid_ids
+    if any(not 1 <= id_ <= MAX_ID for id_ in ids):
+        raise invalid_ids
+    if not ids or len(ids) > MAX_LOOKUP_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Between 1 and {MAX_LOOKUP_IDS} ids are required",
+        )
+    return ids
+
+
+def in_request_order(ids: Sequence[int], rows: Sequence[Any]) -> tuple[list[Any], list[int]]:
+    """Rows ordered like ``ids``, and the ids that matched no row; duplicates count once."""
+    ids = list(dict.fromkeys(ids))
+    by_id = {row.id: row for row in rows}
+    found = [by_id[id_] for id_ in ids if id_ in by_id]
+    missing = [id_ for id_ in ids if id_ not in by_id]
+    return found, missing
+
+
+def lookup_response(field_set: FieldSet, items: Sequence[Any], missing: Sequence[int]) -> Response:
+    body = b'{"items":%s,"missing":%s}' % (
+        field_set.list_serializer.dump(items, trusted=True),
+        orjson.dumps(list(missing)),
+    )
+    return Response(body, media_type="application/json")
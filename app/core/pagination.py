@@ -0,0 +1,98 @@
+import base64
+import binascii
+import json
+from typing import Any, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    payload = json.dumps({"s": sort, "v": list(values)}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+MAX_INT = 2**31 - 1
+
+
+def _valid_value(value: Any, python_type: type) -> bool:
+    """Whether ``value`` can be bound against a column of ``python_type``."""
+    if isinstance(value, bool) or not isinstance(value, python_type):
+        return False
+    if isinstance(value, int):
+        return -MAX_INT - 1 <= value <= MAX_INT
+    if isinstance(value, str):
+        return "\x00" not in value
+    return True
+
+
+def decode_cursor(cursor: str, sort: str, types: Sequence[type]) -> list[Any]:
+    invalid_cursor = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor",
+    )
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        cursor_sort, values = payload["s"], payload["v"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise invalid_cursor
+
+    if cursor_sort != sort or not isinstance(values, list) or len(values) != len(types):
+        raise invalid_cursor
+    if not all(_valid_value(value, python_type) for value, python_type in zip(values, types)):
+        raise invalid_cursor
+    return values
+
+
+def paginate(
+    stmt: Select,
+    columns: Sequence[InstrumentedAttribute],
+    *,
+    sort: str,
+    limit: int,
+    after: str | None = None,
+) -> Select:
+    """Apply keyset pagination: stable ordering on ``columns`` and a seek past ``after``."""
+    if after is not None:
+        values = decode_cursor(after, sort, [column.type.python_type for column in columns])
+        if len(columns) == 1:
+            stmt = stmt.where(columns[0] > values[0])
+        else:
+            stmt = stmt.where(tuple_(*columns) > tuple_(*values))
+    return stmt.order_by(*columns).limit(limit)
+
+
+def next_cursor(
+    items: Sequence[Any],
+    columns: Sequence[InstrumentedAttribute],
+    *,
+    sort: str,
+    limit: int,
+) -> str | None:
+    if len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(sort, [getattr(last, column.key) for column in columns])
+
+
+def decode_offset(after: str | None, sort: str) -> int:
+    if after is None:
+        return 0
+    offset = decode_cursor(after, sort, [int])[0]
+    if offset < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+    return offset
+
+
+def next_offset_cursor(items: Sequence[Any], *, sort: str, limit: int, offset: int) -> str | None:
+    """Cursor for result sets without a stable seek key, such as relevance-ranked search."""
+    if len(items) < limit:
+        return None
+    return encode_cursor(sort, [offset + limit])
@@ -1,13 +1,66 @@
+import asyncio
+import hashlib
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict
+from typing import Any, Callable, Dict, TypeVar
 
+from fastapi import HTTPException, status
 from jose import jwt
 from passlib.context import CryptContext
 
+from app.core.cache import LRUCache
 from app.core.config import settings
+from app.core.metrics import Counter, registry
+
+T = TypeVar("T")
 
 pwd_context: CryptContext = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+jwt_cache_requests = registry.register(
+    Counter("jwt_cache_requests_total", "Verified-token cache lookups by result.", ["result"])
+)
+password_hash_rejections = registry.register(
+    Counter(
+        "password_hash_rejections_total",
+        "Password hashing requests rejected because the hashing pool was saturated.",
+    )
+)
+
+
+class BoundedExecutor:
+    """Thread pool that sheds load instead of growing an unbounded queue.
+
+    ``pending`` counts running and queued calls; it is only touched from the event loop,
+    so no lock is needed.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+        self.max_pending = max_pending
+        self.pending = 0
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        if self.pending >= self.max_pending:
+            password_hash_rejections.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+
+
+password_executor = BoundedExecutor(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -17,17 +70,57 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def hash_password_async(password: str) -> str:
+    """:func:`hash_password` on the bounded password pool, off the event loop."""
+    return await password_executor.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """:func:`verify_password` on the bounded password pool, off the event loop."""
+    return await password_executor.run(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: Dict[str, Any]) -> str:
     to_encode: Dict[str, Any] = data.copy()
     expire: datetime = datetime.now(timezone.utc) + timedelta(
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
     )
-    to_encode.update({"exp": expire, "sub": "access"})
+    to_encode.update({"exp": expire, "sub": "access", "jti": secrets.token_hex(16)})
     encoded_jwt: str = jwt.encode(
         to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM
     )
     return encoded_jwt
 
 
+def generate_refresh_token() -> str:
+    return secrets.token_urlsafe(32)
+
+
+def hash_refresh_token(token: str) -> str:
+    """Refresh tokens are random, so a fast unsalted digest is enough to store them."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 def encode_token(token: str) -> Dict[str, Any]:
     return jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+
+
+token_cache = LRUCache(max_entries=settings.JWT_CACHE_MAX_ENTRIES)
+
+
+def decode_token_cached(token: str) -> Dict[str, Any]:
+    """:func:`encode_token` with verified claims kept until the token's ``exp``.
+
+    Only tokens that passed verification are cached, and a hit is re-checked against
+    ``exp`` so an expired token is never accepted from the cache.
+    """
+    claims = token_cache.get(token)
+    if claims is not None and claims["exp"] > time.time():
+        jwt_cache_requests.inc(result="hit")
+        return claims
+
+    jwt_cache_requests.inc(result="miss")
+    claims = encode_token(token)
+    if isinstance(claims.get("exp"), (int, float)):
+        token_cache.set(token, claims, ttl=claims["exp"] - time.time())
+    return claims
@@ -0,0 +1,41 @@
+from typing import Any, Generic, Mapping, TypeVar
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+T = TypeVar("T")
+
+
+class JSONSerializer(Generic[T]):
+    """Precompiled validator and JSON encoder for one response type.
+
+    FastAPI validates a handler's return value against ``response_model``, turns it
+    into Python primitives and then encodes those. Returning :meth:`response` instead
+    validates ORM objects once, from attributes, and has pydantic-core write the JSON
+    bytes directly. Data that is already an instance of the response type can be
+    passed with ``trusted=True`` to skip validation altogether.
+    """
+
+    def __init__(self, type_: Any):
+        self.adapter: TypeAdapter[T] = TypeAdapter(type_)
+
+    def dump(self, data: Any, *, trusted: bool = False, include: set[str] | None = None) -> bytes:
+        if not trusted:
+            data = self.adapter.validate_python(data, from_attributes=True)
+        return self.adapter.dump_json(data, by_alias=True, include=include)
+
+    def response(
+        self,
+        data: Any,
+        *,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        trusted: bool = False,
+        include: set[str] | None = None,
+    ) -> Response:
+        return Response(
+            self.dump(data, trusted=trusted, include=include),
+            status_code=status_code,
+            headers=headers,
+            media_type="application/json",
+        )
@@ -1,12 +1,99 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from typing import Annotated
+
+from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 
 from app.core.config import settings
+from app.db.pool import InstrumentedPool, instrument_pool, pgbouncer_connect_args
+from app.db.replicas import Replica, ReplicaRouter, register_replica_metrics
+from app.db.session import ReleasingSession
+from app.db.slow_queries import SlowQueryLog
+
+slow_query_log = (
+    SlowQueryLog(
+        threshold=settings.SLOW_QUERY_THRESHOLD_SECONDS,
+        sample_rate=settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+        explain_file=settings.SLOW_QUERY_EXPLAIN_FILE,
+        max_bytes=settings.SLOW_QUERY_EXPLAIN_MAX_BYTES,
+        backups=settings.SLOW_QUERY_EXPLAIN_BACKUPS,
+    )
+    if settings.SLOW_QUERY_THRESHOLD_SECONDS is not None
+    else None
+)
+
+
+def build_engine(url: str, name: str) -> AsyncEngine:
+    """Create an engine whose pool is sized from ``DB_POOL_*`` settings and instrumented.
+
+    Each gunicorn worker owns a pool, so the worst case per host is
+    ``workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW)`` server connections.
+    """
+    engine = create_async_engine(
+        url,
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_logging_name=name,
+        connect_args=pgbouncer_connect_args() if settings.DB_PGBOUNCER else {},
+    )
+    instrument_pool(name, engine.pool)
+    if slow_query_log is not None:
+        slow_query_log.install(engine.sync_engine)
+    return engine
+
+
+engine = build_engine(settings.POSTGRES_URL_ASYNC, "primary")
+
+async_session_maker = async_sessionmaker(
+    bind=engine, class_=ReleasingSession, expire_on_commit=False
+)
+
+
+def build_replica_router(urls: list[str]) -> ReplicaRouter:
+    replicas = [
+        Replica(f"replica{number}", build_engine(url, f"replica{number}"))
+        for number, url in enumerate(urls, start=1)
+    ]
+    return ReplicaRouter(
+        replicas,
+        max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+        check_interval=settings.REPLICA_CHECK_INTERVAL_SECONDS,
+    )
 
-engine = create_async_engine(settings.POSTGRES_URL_ASYNC)
 
-async_session_maker = async_sessionmaker(bind=engine, expire_on_commit=False)
+replica_router = build_replica_router(settings.POSTGRES_REPLICA_URLS_ASYNC)
+register_replica_metrics(replica_router)
 
 
 async def get_db():
     async with async_session_maker() as session:
         yield session
+
+
+def get_session_maker() -> async_sessionmaker:
+    """For work that outlives the request scope, such as streaming response bodies."""
+    return async_session_maker
+
+
+def get_replica_router() -> ReplicaRouter:
+    return replica_router
+
+
+async def get_read_session_maker(
+    request: Request,
+    router: Annotated[ReplicaRouter, Depends(get_replica_router)],
+    primary: Annotated[async_sessionmaker, Depends(get_session_maker)],
+) -> async_sessionmaker:
+    """Sessions for read-only work: on a replica when one is usable, else the primary."""
+    replica = await router.choose(request)
+    return replica.session_maker if replica is not None else primary
+
+
+async def get_read_db(
+    sessions: Annotated[async_sessionmaker, Depends(get_read_session_maker)],
+):
+    async with sessions() as session:
+        yield session
@@ -0,0 +1,99 @@
+import time
+import uuid
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+from app.core.metrics import Counter, Gauge, Histogram, registry
+
+LIFETIME_BUCKETS = (1, 10, 60, 300, 900, 1800, 3600, 4 * 3600, 12 * 3600, 24 * 3600)
+
+checkout_wait = registry.register(
+    Histogram(
+        "db_pool_checkout_wait_seconds",
+        "Time spent waiting for a pooled connection, including opening a new one.",
+        ["pool"],
+    )
+)
+checkout_timeouts = registry.register(
+    Counter(
+        "db_pool_checkout_timeouts_total",
+        "Checkouts that gave up after pool_timeout.",
+        ["pool"],
+    )
+)
+connection_lifetime = registry.register(
+    Histogram(
+        "db_pool_connection_lifetime_seconds",
+        "Age of database connections when they are closed.",
+        ["pool"],
+        buckets=LIFETIME_BUCKETS,
+    )
+)
+
+_pools: dict[str, Pool] = {}
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """``AsyncAdaptedQueuePool`` that records how long each checkout waits."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            checkout_timeouts.inc(pool=self.logging_name)
+            raise
+        finally:
+            checkout_wait.observe(time.perf_counter() - start, pool=self.logging_name)
+
+
+def instrument_pool(name: str, pool: Pool) -> None:
+    """Publish occupancy of ``pool`` and the lifetime of the connections it closes."""
+    _pools[name] = pool
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+        connection_record.info["connected_at"] = time.monotonic()
+
+    @event.listens_for(pool, "close")
+    def on_close(dbapi_connection: Any, connection_record: Any) -> None:
+        connected_at = connection_record.info.pop("connected_at", None)
+        if connected_at is not None:
+            connection_lifetime.observe(time.monotonic() - connected_at, pool=name)
+
+
+def _pool_usage() -> dict[tuple, float]:
+    usage = {}
+    for name, pool in _pools.items():
+        if not isinstance(pool, AsyncAdaptedQueuePool):
+            continue
+        usage[(name, "size")] = pool.size()
+        usage[(name, "checked_out")] = pool.checkedout()
+        usage[(name, "idle")] = pool.checkedin()
+        usage[(name, "overflow")] = max(pool.overflow(), 0)
+    return usage
+
+
+registry.register(
+    Gauge(
+        "db_pool_connections",
+        "Pooled database connections by state.",
+        ["pool", "state"],
+        callback=_pool_usage,
+    )
+)
+
+
+def pgbouncer_connect_args() -> dict[str, Any]:
+    """asyncpg arguments for PgBouncer in transaction pooling mode.
+
+    Server connections change between transactions, so asyncpg must not cache
+    prepared statements and each statement needs a name unique across clients.
+    """
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+    }
@@ -0,0 +1,129 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.metrics import Histogram, registry
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+ROW_COUNT_BUCKETS = (0, 1, 10, 50, 100, 500, 1000, 5000, 10_000, 50_000)
+
+request_queries = registry.register(
+    Histogram(
+        "http_request_db_queries",
+        "SQL statements issued per request.",
+        ["method", "route"],
+        buckets=QUERY_COUNT_BUCKETS,
+    )
+)
+request_db_seconds = registry.register(
+    Histogram(
+        "http_request_db_seconds",
+        "Time spent executing SQL statements per request.",
+        ["method", "route"],
+    )
+)
+request_rows = registry.register(
+    Histogram(
+        "http_request_db_rows",
+        "Rows returned by SQL statements per request.",
+        ["method", "route"],
+        buckets=ROW_COUNT_BUCKETS,
+    )
+)
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0
+    rows: int = 0
+    statements: list[str] | None = field(default=None, repr=False)
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries", '
+            f'db-rows;desc="{self.rows} rows"'
+        )
+
+
+_active: ContextVar[tuple[QueryStats, ...]] = ContextVar("active_query_stats", default=())
+_request_scope: ContextVar[dict[str, Any] | None] = ContextVar("request_scope", default=None)
+
+
+def current_route() -> str | None:
+    """``METHOD /route/{template}`` of the request being served, if any."""
+    scope = _request_scope.get()
+    if scope is None:
+        return None
+    return f"{scope['method']} {getattr(scope.get('route'), 'path', scope['path'])}"
+
+
+@contextmanager
+def track_queries(record_statements: bool = False) -> Iterator[QueryStats]:
+    """Count statements executed in the current context, including nested trackers."""
+    stats = QueryStats(statements=[] if record_statements else None)
+    token = _active.set((*_active.get(), stats))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _active.get():
+        context._query_started_at = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    trackers = _active.get()
+    if not trackers:
+        return
+    duration = time.perf_counter() - getattr(context, "_query_started_at", time.perf_counter())
+    rows = max(cursor.rowcount, 0) if cursor.description is not None else 0
+    for stats in trackers:
+        stats.count += 1
+        stats.duration += duration
+        stats.rows += rows
+        if stats.statements is not None:
+            stats.statements.append(statement)
+
+
+class QueryStatsMiddleware:
+    """Reports SQL statistics per request as a ``Server-Timing`` header and as metrics.
+
+    The header covers statements issued before the response starts; statements run
+    while a streaming body is produced are only reflected in the metrics.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope: dict[str, Any], receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                timing = stats.server_timing().encode()
+                message["headers"] = [*message.get("headers", []), (b"server-timing", timing)]
+            await send(message)
+
+        scope_token = _request_scope.set(scope)
+        with track_queries() as stats:
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                _request_scope.reset(scope_token)
+                route = getattr(scope.get("route"), "path", "unmatched")
+                labels = {"method": scope["method"], "route": route}
+                request_queries.observe(stats.count, **labels)
+                request_db_seconds.observe(stats.duration, **labels)
+                request_rows.observe(stats.rows, **labels)
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import math
+import random
+import time
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.core.metrics import Counter, Gauge, registry
+from app.db.session import ReleasingSession
+
+logger = logging.getLogger(__name__)
+
+STICKY_COOKIE = "read_primary_until"
+UNSAFE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+READ_ONLY_POST_SUFFIX = "/lookup"
+
+# Replay lag is zero while the replica has applied everything it received; otherwise it
+# is the age of the last replayed transaction.
+LAG_QUERY = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+read_routes = registry.register(
+    Counter(
+        "db_read_routing_total",
+        "Read-only sessions by the database they were routed to and why.",
+        ["target", "reason"],
+    )
+)
+
+
+class Replica:
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.session_maker = async_sessionmaker(
+            bind=engine, class_=ReleasingSession, expire_on_commit=False
+        )
+        self.healthy = True
+        self.lag = 0.0
+
+    async def _read_lag(self) -> float:
+        async with self.engine.connect() as connection:
+            return float(await connection.scalar(LAG_QUERY))
+
+    async def check(self, timeout: float) -> None:
+        try:
+            self.lag = await asyncio.wait_for(self._read_lag(), timeout)
+            self.healthy = True
+        except Exception as exc:
+            if self.healthy:
+                logger.warning("Replica %s failed its health check: %s", self.name, exc)
+            self.healthy = False
+
+
+def _sticky_until(request: Request) -> float:
+    """Expiry of the read-your-writes cookie; malformed values count as expired."""
+    try:
+        until = float(request.cookies.get(STICKY_COOKIE) or 0)
+    except ValueError:
+        return 0
+    return until if math.isfinite(until) else 0
+
+
+class ReplicaRouter:
+    """Routes read-only sessions to a healthy replica that is within the lag budget.
+
+    Health and lag are re-checked lazily, at most every ``check_interval`` seconds.
+    Clients that wrote recently carry a cookie that pins their reads to the primary,
+    so they always read their own writes.
+    """
+
+    def __init__(
+        self,
+        replicas: list[Replica],
+        max_lag: float,
+        check_interval: float,
+        check_timeout: float = 1.0,
+    ):
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self.checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def refresh(self, force: bool = False) -> None:
+        if not force and time.monotonic() - self.checked_at < self.check_interval:
+            return
+        async with self._lock:
+            if not force and time.monotonic() - self.checked_at < self.check_interval:
+                return
+            await asyncio.gather(*(replica.check(self.check_timeout) for replica in self.replicas))
+            self.checked_at = time.monotonic()
+
+    async def choose(self, request: Request) -> Replica | None:
+        """The replica to read from, or ``None`` to read from the primary."""
+        if not self.replicas:
+            return None
+        if _sticky_until(request) > time.time():
+            read_routes.inc(target="primary", reason="sticky")
+            return None
+
+        await self.refresh()
+        candidates = [r for r in self.replicas if r.healthy and r.lag <= self.max_lag]
+        if not candidates:
+            read_routes.inc(target="primary", reason="no_replica")
+            return None
+        replica = random.choice(candidates)
+        read_routes.inc(target=replica.name, reason="replica")
+        return replica
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+class StickyPrimaryMiddleware:
+    """Sets the read-your-writes cookie on successful write requests.
+
+    ``POST .../lookup`` only carries an id list in its body and does not count as a write.
+    """
+
+    def __init__(self, app, sticky_seconds: float):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in UNSAFE_METHODS
+            or scope["path"].endswith(READ_ONLY_POST_SUFFIX)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + self.sticky_seconds
+                cookie = (
+                    f"{STICKY_COOKIE}={until:.3f}; Max-Age={max(1, round(self.sticky_seconds))};"
+                    " Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+def _replica_status(router: ReplicaRouter) -> dict[tuple, float]:
+    status = {}
+    for replica in router.replicas:
+        status[(replica.name, "healthy")] = int(replica.healthy)
+        status[(replica.name, "lag_seconds")] = replica.lag
+    return status
+
+
+def register_replica_metrics(router: ReplicaRouter) -> None:
+    registry.register(
+        Gauge(
+            "db_replica_status",
+            "Replica health and replay lag as of the last check.",
+            ["replica", "field"],
+            callback=lambda: _replica_status(router),
+        )
+    )
@@ -0,0 +1,68 @@
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.core.metrics import Counter, registry
+
+AUTOCOMMIT = {"isolation_level": "AUTOCOMMIT"}
+
+standalone_reads = registry.register(
+    Counter(
+        "db_standalone_reads_total",
+        "Reads run outside a transaction that returned their connection immediately.",
+    )
+)
+
+
+def _is_plain_read(statement: Any) -> bool:
+    if not isinstance(statement, Select) or statement._for_update_arg is not None:
+        return False
+    return not any(isinstance(element, UpdateBase) for element in visitors.iterate(statement))
+
+
+class ReleasingSession(AsyncSession):
+    """``AsyncSession`` that holds a connection only while a statement needs one.
+
+    The session checks out nothing until its first statement. A plain SELECT issued
+    outside a transaction, with nothing pending to flush, runs on an autocommit
+    connection that goes back to the pool as soon as the rows are buffered, so no
+    BEGIN/COMMIT round trips are spent and the connection is not held through
+    password hashing, serialization or the rest of the request. Writes, locking reads
+    and everything inside ``begin()`` keep the usual transactional behaviour.
+    """
+
+    def _releasable(self) -> bool:
+        return not self.in_transaction() and not (self.new or self.dirty or self.deleted)
+
+    @asynccontextmanager
+    async def _standalone_read(self) -> AsyncIterator[None]:
+        await self.connection(execution_options=AUTOCOMMIT)
+        try:
+            yield
+        except BaseException:
+            await self.rollback()
+            raise
+        await self.commit()
+        standalone_reads.inc()
+
+    async def execute(self, statement: Any, *args: Any, **kwargs: Any):
+        if not (_is_plain_read(statement) and self._releasable()):
+            return await super().execute(statement, *args, **kwargs)
+        async with self._standalone_read():
+            return await super().execute(statement, *args, **kwargs)
+
+    async def scalar(self, statement: Any, *args: Any, **kwargs: Any):
+        if not (_is_plain_read(statement) and self._releasable()):
+            return await super().scalar(statement, *args, **kwargs)
+        async with self._standalone_read():
+            return await super().scalar(statement, *args, **kwargs)
+
+    async def get(self, entity: Any, ident: Any, **kwargs: Any):
+        if kwargs.get("with_for_update") or not self._releasable():
+            return await super().get(entity, ident, **kwargs)
+        async with self._standalone_read():
+            return await super().get(entity, ident, **kwargs)
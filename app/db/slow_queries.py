@@ -0,0 +1,126 @@
+import logging
+import random
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.metrics import Counter, registry
+from app.db.query_stats import current_route
+from app.db.session import _is_plain_read
+
+logger = logging.getLogger(__name__)
+
+slow_queries = registry.register(
+    Counter("db_slow_queries_total", "Statements slower than the slow-query threshold.", ["route"])
+)
+
+
+def parameter_shape(parameters: Any) -> Any:
+    """Types of bound parameters without their values, which may hold personal data."""
+    if isinstance(parameters, dict):
+        return {key: parameter_shape(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if len(parameters) > 10 and all(
+            isinstance(item, (list, tuple, dict)) for item in parameters
+        ):
+            return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+        return [parameter_shape(item) for item in parameters]
+    if isinstance(parameters, (str, bytes)):
+        return f"{type(parameters).__name__}[{len(parameters)}]"
+    return type(parameters).__name__
+
+
+class SlowQueryLog:
+    """Logs statements slower than ``threshold`` seconds with the route that issued them.
+
+    For a ``sample_rate`` fraction of slow statements the plan is appended to a
+    rotating file: ``EXPLAIN (ANALYZE, BUFFERS)`` for plain reads, and a plain
+    ``EXPLAIN`` for anything that writes or locks, since ANALYZE would run it again.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        sample_rate: float = 0.0,
+        explain_file: str | Path | None = None,
+        max_bytes: int = 10 * 1024 * 1024,
+        backups: int = 5,
+    ):
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.explain_file = explain_file
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._explain_logger: logging.Logger | None = None
+
+    @property
+    def explain_logger(self) -> logging.Logger:
+        if self._explain_logger is None:
+            path = Path(self.explain_file)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(
+                path, maxBytes=self.max_bytes, backupCount=self.backups, encoding="utf-8"
+            )
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            explain_logger = logging.getLogger(f"{__name__}.explain.{path}")
+            explain_logger.propagate = False
+            explain_logger.setLevel(logging.INFO)
+            explain_logger.addHandler(handler)
+            self._explain_logger = explain_logger
+        return self._explain_logger
+
+    def install(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_started_at = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - context._slow_query_started_at
+        if duration < self.threshold:
+            return
+
+        route = current_route() or "background"
+        slow_queries.inc(route=route)
+        logger.warning(
+            "Slow query (%.1f ms) from %s: %s; parameters: %s",
+            duration * 1000,
+            route,
+            statement,
+            parameter_shape(parameters),
+        )
+        if self.explain_file and not executemany and random.random() < self.sample_rate:
+            self._explain(conn, statement, parameters, context, duration, route)
+
+    def _explain(self, conn, statement, parameters, context, duration, route) -> None:
+        compiled = context.compiled
+        analyze = compiled is not None and _is_plain_read(compiled.statement)
+        prefix = "EXPLAIN (ANALYZE, BUFFERS)" if analyze else "EXPLAIN"
+        dbapi_connection = conn.connection.dbapi_connection
+        # A failed EXPLAIN must not abort the caller's transaction.
+        in_transaction = not getattr(dbapi_connection, "autocommit", False)
+        # A separate DBAPI cursor keeps the original result intact and bypasses the
+        # engine events, so the EXPLAIN itself is neither counted nor logged.
+        cursor = dbapi_connection.cursor()
+        try:
+            if in_transaction:
+                cursor.execute("SAVEPOINT slow_query_explain")
+            cursor.execute(f"{prefix} {statement}", parameters)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            if in_transaction:
+                cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        except Exception as exc:
+            if in_transaction:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            logger.warning("Could not EXPLAIN slow query: %s", exc)
+            return
+        finally:
+            cursor.close()
+        self.explain_logger.info(
+            "%.1f ms from %s\n%s\n%s\n", duration * 1000, route, statement, plan
+        )
@@ -1,31 +1,45 @@
-from typing import Annotated
+from typing import Annotated, Any
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import ExpiredSignatureError, JWTError
 
-from app.core.security import encode_token
+from app.core.security import decode_token_cached
+from app.dependencies.db import db
+from app.services.token_revocation_service import is_token_revoked
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/librarians/login")
 
 
-async def get_current_user_id(token: Annotated[str, Depends(oauth2_scheme)]):
+async def get_token_claims(
+    token: Annotated[str, Depends(oauth2_scheme)], session: db
+) -> dict[str, Any]:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        data = encode_token(token)
-        user_id = data.get("user_id")
-        if user_id is None:
+        data = decode_token_cached(token)
+        if data.get("user_id") is None:
             raise credentials_exception
     except ExpiredSignatureError:
         raise credentials_exception
     except JWTError:
         raise credentials_exception
 
-    return user_id
+    jti = data.get("jti")
+    if jti is not None and await is_token_revoked(session, jti):
+        raise credentials_exception
+
+    return data
+
+
+token_claims = Annotated[dict[str, Any], Depends(get_token_claims)]
+
+
+async def get_current_user_id(claims: token_claims):
+    return claims["user_id"]
 
 
 librarian_id = Annotated[int, Depends(get_current_user_id)]
@@ -1,8 +1,11 @@
 from typing import Annotated
 
 from fastapi import Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db, get_read_session_maker, get_session_maker
 
 db = Annotated[AsyncSession, Depends(get_db)]
+read_db = Annotated[AsyncSession, Depends(get_read_db)]
+session_maker = Annotated[async_sessionmaker, Depends(get_session_maker)]
+read_session_maker = Annotated[async_sessionmaker, Depends(get_read_session_maker)]
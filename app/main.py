@@ -1,6 +1,25 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
 from app.api.v1.api import api_router
+from app.core.compression import CompressionMiddleware, available_encoders
+from app.core.config import settings
+from app.db.database import replica_router
+from app.db.query_stats import QueryStatsMiddleware
+from app.db.replicas import StickyPrimaryMiddleware
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+app.add_middleware(QueryStatsMiddleware)
+if replica_router.replicas:
+    app.add_middleware(StickyPrimaryMiddleware, sticky_seconds=settings.REPLICA_STICKY_SECONDS)
+app.add_middleware(
+    CompressionMiddleware,
+    encoders=available_encoders(
+        settings.COMPRESSION_ENCODINGS,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+    ),
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+)
 app.include_router(api_router, prefix="/api/v1")
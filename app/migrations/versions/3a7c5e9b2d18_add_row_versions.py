@@ -0,0 +1,30 @@
+"""add_row_versions
+
+Revision ID: 3a7c5e9b2d18
+Revises: e2f6b9a04c17
+Create Date: 2026-10-17 14:05:37.602914
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3a7c5e9b2d18"
+down_revision: Union[str, None] = "e2f6b9a04c17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("books", sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+    op.add_column("users", sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "version")
+    op.drop_column("books", "version")
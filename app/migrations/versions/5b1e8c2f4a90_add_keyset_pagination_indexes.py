@@ -0,0 +1,31 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: 5b1e8c2f4a90
+Revises: cf7d3dd2950e
+Create Date: 2026-10-17 10:12:04.518231
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b1e8c2f4a90"
+down_revision: Union[str, None] = "cf7d3dd2950e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_books_title_id", "books", ["title", "id"], unique=False)
+    op.create_index("ix_books_author_id", "books", ["author", "id"], unique=False)
+    op.create_index("ix_users_name_id", "users", ["name", "id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_users_name_id", table_name="users")
+    op.drop_index("ix_books_author_id", table_name="books")
+    op.drop_index("ix_books_title_id", table_name="books")
@@ -0,0 +1,55 @@
+"""add_book_copy_shards
+
+Revision ID: 7f2d8a4c6b31
+Revises: 3a7c5e9b2d18
+Create Date: 2026-10-17 16:48:12.730455
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7f2d8a4c6b31"
+down_revision: Union[str, None] = "3a7c5e9b2d18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "books",
+        sa.Column("copy_shards", sa.Integer(), server_default="1", nullable=False),
+    )
+    op.create_check_constraint("copy_shards_positive", "books", "copy_shards >= 1")
+    op.create_table(
+        "book_copy_shards",
+        sa.Column("book_id", sa.Integer(), nullable=False),
+        sa.Column("shard", sa.SmallInteger(), nullable=False),
+        sa.Column("copies_count", sa.Integer(), nullable=False),
+        sa.CheckConstraint("copies_count >= 0", name="shard_copies_count_non_negative"),
+        sa.ForeignKeyConstraint(["book_id"], ["books.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("book_id", "shard"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        """
+        UPDATE books
+        SET copies_count = books.copies_count + shards.copies_count
+        FROM (
+            SELECT book_id, sum(copies_count) AS copies_count
+            FROM book_copy_shards
+            GROUP BY book_id
+        ) AS shards
+        WHERE books.id = shards.book_id
+        """
+    )
+    op.drop_table("book_copy_shards")
+    op.drop_constraint("copy_shards_positive", "books", type_="check")
+    op.drop_column("books", "copy_shards")
@@ -0,0 +1,62 @@
+"""add_active_borrows_counter_and_indexes
+
+Revision ID: 9d4a7f3c1e62
+Revises: 5b1e8c2f4a90
+Create Date: 2026-10-17 11:02:37.904115
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9d4a7f3c1e62"
+down_revision: Union[str, None] = "5b1e8c2f4a90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_borrowed_books_active_reader",
+        "borrowed_books",
+        ["reader_id"],
+        unique=False,
+        postgresql_where=sa.text("return_date IS NULL"),
+    )
+    op.create_index(
+        "ix_borrowed_books_active_book",
+        "borrowed_books",
+        ["book_id", "reader_id"],
+        unique=False,
+        postgresql_where=sa.text("return_date IS NULL"),
+    )
+    op.add_column(
+        "users",
+        sa.Column("active_borrows", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.execute(
+        """
+        UPDATE users
+        SET active_borrows = active.count
+        FROM (
+            SELECT reader_id, count(*) AS count
+            FROM borrowed_books
+            WHERE return_date IS NULL
+            GROUP BY reader_id
+        ) AS active
+        WHERE users.id = active.reader_id
+        """
+    )
+    op.create_check_constraint("active_borrows_non_negative", "users", "active_borrows >= 0")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("active_borrows_non_negative", "users", type_="check")
+    op.drop_column("users", "active_borrows")
+    op.drop_index("ix_borrowed_books_active_book", table_name="borrowed_books")
+    op.drop_index("ix_borrowed_books_active_reader", table_name="borrowed_books")
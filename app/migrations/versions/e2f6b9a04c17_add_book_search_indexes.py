@@ -0,0 +1,70 @@
+"""add_book_search_indexes
+
+Revision ID: e2f6b9a04c17
+Revises: 9d4a7f3c1e62
+Create Date: 2026-10-17 12:20:51.377402
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "e2f6b9a04c17"
+down_revision: Union[str, None] = "9d4a7f3c1e62"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        "books",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('simple', coalesce(author, '')), 'B') || "
+                "setweight(to_tsvector('simple', coalesce(description, '')), 'C')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_books_search_vector",
+        "books",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    # Trigram indexes live only in migrations: the operator class comes from pg_trgm.
+    op.create_index(
+        "ix_books_title_trgm",
+        "books",
+        ["title"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_books_author_trgm",
+        "books",
+        ["author"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"author": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_books_author_trgm", table_name="books")
+    op.drop_index("ix_books_title_trgm", table_name="books")
+    op.drop_index("ix_books_search_vector", table_name="books")
+    op.drop_column("books", "search_vector")
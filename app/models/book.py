@@ -1,7 +1,9 @@
-from sqlalchemy import CheckConstraint, Integer, String
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import CheckConstraint, Computed, Index, Integer, String, func, select
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, column_property, mapped_column
 
 from .base import Base
+from .book_copy_shard import BookCopyShard
 
 
 class Book(Base):
@@ -14,5 +16,36 @@ class Book(Base):
     isbn: Mapped[str | None] = mapped_column(String, unique=True, nullable=True)
     copies_count: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
     description: Mapped[str | None] = mapped_column(String, nullable=True)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(author, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'C')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
+    copy_shards: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
 
-    __table_args__ = (CheckConstraint("copies_count >= 0", name="copies_count_non_negative"),)
+    __table_args__ = (
+        CheckConstraint("copies_count >= 0", name="copies_count_non_negative"),
+        CheckConstraint("copy_shards >= 1", name="copy_shards_positive"),
+        Index("ix_books_title_id", "title", "id"),
+        Index("ix_books_author_id", "author", "id"),
+        Index("ix_books_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+
+# Copies of a sharded book live in ``book_copy_shards``; ``copies_count`` then only holds
+# what has not been spread over shards, so availability is always the sum of both.
+Book.available_copies = column_property(
+    Book.copies_count
+    + func.coalesce(
+        select(func.sum(BookCopyShard.copies_count))
+        .where(BookCopyShard.book_id == Book.id)
+        .scalar_subquery(),
+        0,
+    )
+)
@@ -0,0 +1,18 @@
+from sqlalchemy import CheckConstraint, ForeignKey, Integer, SmallInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class BookCopyShard(Base):
+    """A slice of a book's available copies, so concurrent borrows lock different rows."""
+
+    __tablename__ = "book_copy_shards"
+
+    book_id: Mapped[int] = mapped_column(
+        ForeignKey("books.id", ondelete="CASCADE"), primary_key=True
+    )
+    shard: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    copies_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    __table_args__ = (CheckConstraint("copies_count >= 0", name="shard_copies_count_non_negative"),)
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import TIMESTAMP, ForeignKey
+from sqlalchemy import TIMESTAMP, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
@@ -22,3 +22,17 @@ class BorrowedBook(Base):
         TIMESTAMP(timezone=True),
         nullable=True,
     )
+
+    __table_args__ = (
+        Index(
+            "ix_borrowed_books_active_reader",
+            "reader_id",
+            postgresql_where=text("return_date IS NULL"),
+        ),
+        Index(
+            "ix_borrowed_books_active_book",
+            "book_id",
+            "reader_id",
+            postgresql_where=text("return_date IS NULL"),
+        ),
+    )
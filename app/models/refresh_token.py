@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy import TIMESTAMP, ForeignKey, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class RefreshToken(Base):
+    """A refresh token, stored only as its SHA-256 digest.
+
+    Every rotation issues a new token in the same ``family``, so presenting a token that
+    was already rotated revokes the whole chain.
+    """
+
+    __tablename__ = "refresh_tokens"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    librarian_id: Mapped[int] = mapped_column(
+        ForeignKey("librarians.id", ondelete="CASCADE"), nullable=False
+    )
+    token_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    family: Mapped[str] = mapped_column(String(32), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+    revoked_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+
+    __table_args__ = (Index("ix_refresh_tokens_family", "family"),)
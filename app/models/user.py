@@ -1,4 +1,4 @@
-from sqlalchemy import String
+from sqlalchemy import CheckConstraint, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
@@ -10,3 +10,12 @@ class User(Base):
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String, nullable=False)
     email: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+    active_borrows: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("active_borrows >= 0", name="active_borrows_non_negative"),
+        Index("ix_users_name_id", "name", "id"),
+    )
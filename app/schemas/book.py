@@ -1,6 +1,18 @@
-from typing import Optional
+from dataclasses import dataclass
+from typing import Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field
+
+from app.core.serialization import JSONSerializer
+
+BookSort = Literal["id", "title", "author"]
+
+MAX_COPY_SHARDS = 64
+
+BOOK_FIELD_PRESETS = {
+    "kiosk": ("id", "title", "copies_count"),
+    "summary": ("id", "title", "author", "publication_year", "copies_count"),
+}
 
 
 class BookIn(BaseModel):
@@ -9,6 +21,7 @@ class BookIn(BaseModel):
     publication_year: Optional[int] = None
     isbn: Optional[str] = None
     copies_count: int = Field(default=1, ge=0)
+    copy_shards: Optional[int] = Field(default=None, ge=1, le=MAX_COPY_SHARDS)
 
 
 class BookPatch(BaseModel):
@@ -17,6 +30,7 @@ class BookPatch(BaseModel):
     publication_year: Optional[int] = None
     isbn: Optional[str] = None
     copies_count: Optional[int] = Field(default=None, ge=0)
+    copy_shards: Optional[int] = Field(default=None, ge=1, le=MAX_COPY_SHARDS)
 
 
 class BookOut(BaseModel):
@@ -25,7 +39,45 @@ class BookOut(BaseModel):
     author: str
     publication_year: Optional[int] = None
     isbn: Optional[str] = None
-    copies_count: int = Field(default=1, ge=0)
+    copies_count: int = Field(
+        default=1, ge=0, validation_alias=AliasChoices("available_copies", "copies_count")
+    )
+    copy_shards: int = 1
+    version: int
 
     class Config:
         from_attributes = True
+
+
+@dataclass(slots=True)
+class BookRow:
+    """Read-only book selected column by column; serializes to the same JSON as ``BookOut``."""
+
+    id: int
+    title: str
+    author: str
+    publication_year: Optional[int]
+    isbn: Optional[str]
+    copies_count: int
+    copy_shards: int
+    version: int
+
+
+book_serializer = JSONSerializer(BookOut)
+
+
+class BookLookupOut(BaseModel):
+    items: list[BookOut]
+    missing: list[int]
+
+
+class BookImportError(BaseModel):
+    row: int
+    detail: str
+
+
+class BookImportReport(BaseModel):
+    received: int
+    inserted: int
+    failed: int
+    errors: list[BookImportError]
@@ -1,7 +1,11 @@
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+BatchMode = Literal["atomic", "partial"]
+
+MAX_BATCH_ITEMS = 100
 
 
 class BorrowRequest(BaseModel):
@@ -18,3 +22,16 @@ class BorrowedBookOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class BorrowBatchRequest(BaseModel):
+    items: list[BorrowRequest] = Field(min_length=1, max_length=MAX_BATCH_ITEMS)
+    mode: BatchMode = "atomic"
+
+
+class BorrowBatchItemOut(BaseModel):
+    book_id: int
+    reader_id: int
+    status_code: int
+    detail: Optional[str] = None
+    borrowed: Optional[BorrowedBookOut] = None
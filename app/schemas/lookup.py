@@ -0,0 +1,11 @@
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+from app.core.lookup import MAX_ID, MAX_LOOKUP_IDS
+
+
+class LookupIn(BaseModel):
+    ids: list[Annotated[int, Field(ge=1, le=MAX_ID)]] = Field(
+        min_length=1, max_length=MAX_LOOKUP_IDS
+    )
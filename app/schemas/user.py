@@ -1,7 +1,16 @@
-from typing import Optional
+from dataclasses import dataclass
+from typing import Literal, Optional
 
 from pydantic import BaseModel, EmailStr
 
+from app.core.serialization import JSONSerializer
+
+UserSort = Literal["id", "name"]
+
+USER_FIELD_PRESETS = {
+    "summary": ("id", "name"),
+}
+
 
 class UserIn(BaseModel):
     name: str
@@ -17,6 +26,25 @@ class UserOut(BaseModel):
     id: int
     name: str
     email: EmailStr
+    version: int
 
     class Config:
         from_attributes = True
+
+
+class UserLookupOut(BaseModel):
+    items: list[UserOut]
+    missing: list[int]
+
+
+@dataclass(slots=True)
+class UserRow:
+    """Read-only user selected column by column; serializes to the same JSON as ``UserOut``."""
+
+    id: int
+    name: str
+    email: str
+    version: int
+
+
+user_serializer = JSONSerializer(UserOut)
@@ -0,0 +1,206 @@
+import codecs
+import csv
+from typing import Any, AsyncIterator, Iterable, Literal
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import Column, Integer, MetaData, String, Table, func, over, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.book import Book
+from app.schemas.book import BookImportError, BookImportReport, BookIn
+
+ImportFormat = Literal["csv", "ndjson"]
+
+IMPORT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+IMPORT_COLUMNS = ("title", "author", "publication_year", "isbn", "copies_count")
+
+staging_table = Table(
+    "book_import_staging",
+    MetaData(),
+    Column("row_number", Integer, nullable=False),
+    Column("title", String, nullable=False),
+    Column("author", String, nullable=False),
+    Column("publication_year", Integer),
+    Column("isbn", String),
+    Column("copies_count", Integer, nullable=False),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+
+async def iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[dict[str, Any]]:
+    """Parse CSV with a header row, keeping quoted multi-line fields together.
+
+    A record is complete once its quote count is even, so records can be handed to
+    ``csv.reader`` in batches without reading the whole upload into memory. Blank
+    lines between records are skipped.
+    """
+    header: list[str] | None = None
+    pending: list[str] = []
+    batch: list[str] = []
+    quotes = 0
+
+    async for line in lines:
+        pending.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        record, pending, quotes = "\n".join(pending), [], 0
+        if not record.strip():
+            continue
+        if header is None:
+            header = [name.strip() for name in next(csv.reader([record]))]
+            continue
+        batch.append(record)
+        if len(batch) >= IMPORT_CHUNK_SIZE:
+            for values in csv.reader(batch):
+                yield dict(zip(header, values))
+            batch = []
+
+    if pending and header is not None:
+        batch.append("\n".join(pending))
+    if header is not None:
+        for values in csv.reader(batch):
+            yield dict(zip(header, values))
+
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[Any]:
+    async for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield orjson.loads(line)
+        except orjson.JSONDecodeError:
+            yield line
+
+
+def iter_records(chunks: AsyncIterator[bytes], fmt: ImportFormat) -> AsyncIterator[Any]:
+    if fmt == "csv":
+        return iter_csv_records(iter_lines(chunks))
+    return iter_ndjson_records(iter_lines(chunks))
+
+
+def _validate(row_number: int, record: Any) -> tuple | str:
+    if not isinstance(record, dict):
+        return "Row is not an object"
+    data = {key: value for key, value in record.items() if value not in ("", None)}
+    try:
+        book = BookIn.model_validate(data)
+    except ValidationError as exc:
+        return "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+            for error in exc.errors()
+        )
+    return (row_number, *(getattr(book, column) for column in IMPORT_COLUMNS))
+
+
+def _merge_statement():
+    """Insert staged rows into ``books`` and return the staged rows that were skipped.
+
+    A row is skipped when its ISBN already exists in ``books`` or appeared earlier in
+    the same import.
+    """
+    staged_columns = [staging_table.c[column] for column in IMPORT_COLUMNS]
+    inserted = (
+        insert(Book)
+        .from_select(
+            list(IMPORT_COLUMNS),
+            select(*staged_columns).order_by(staging_table.c.row_number),
+        )
+        .on_conflict_do_nothing(index_elements=[Book.isbn])
+        .returning(Book.isbn)
+        .cte("inserted")
+    )
+    ranked = (
+        select(
+            staging_table.c.row_number,
+            staging_table.c.isbn,
+            over(
+                func.row_number(),
+                partition_by=staging_table.c.isbn,
+                order_by=staging_table.c.row_number,
+            ).label("position"),
+        )
+        .where(staging_table.c.isbn.is_not(None))
+        .subquery("ranked")
+    )
+    return (
+        select(ranked.c.row_number, ranked.c.isbn)
+        .select_from(ranked.outerjoin(inserted, inserted.c.isbn == ranked.c.isbn))
+        .where((ranked.c.position > 1) | inserted.c.isbn.is_(None))
+        .order_by(ranked.c.row_number)
+    )
+
+
+async def import_books(session: AsyncSession, records: AsyncIterator[Any]) -> BookImportReport:
+    """Validate records in chunks, COPY them into a staging table and merge into ``books``.
+
+    Everything runs in one transaction; invalid rows and ISBN conflicts are reported
+    per row instead of aborting the import.
+    """
+    received = 0
+    failed = 0
+    errors: list[BookImportError] = []
+
+    def report(row_number: int, detail: str) -> None:
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append(BookImportError(row=row_number, detail=detail))
+
+    async with session.begin():
+        connection = await session.connection()
+        await connection.run_sync(staging_table.create)
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+
+        async def copy(rows: Iterable[tuple]) -> None:
+            await driver_connection.copy_records_to_table(
+                staging_table.name,
+                records=rows,
+                columns=["row_number", *IMPORT_COLUMNS],
+            )
+
+        chunk: list[tuple] = []
+        async for record in records:
+            received += 1
+            validated = _validate(received, record)
+            if isinstance(validated, str):
+                report(received, validated)
+                continue
+            chunk.append(validated)
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                await copy(chunk)
+                chunk = []
+        if chunk:
+            await copy(chunk)
+        await session.execute(text(f"ANALYZE {staging_table.name}"))
+
+        result = await session.execute(_merge_statement())
+        for row in result:
+            report(row.row_number, f"Book with ISBN {row.isbn} already exists")
+
+    errors.sort(key=lambda error: error.row)
+    return BookImportReport(
+        received=received,
+        inserted=received - failed,
+        failed=failed,
+        errors=errors,
+    )
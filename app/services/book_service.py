@@ -1,9 +1,46 @@
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import Integer, any_, bindparam, cast, delete, func, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, REGCONFIG, insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.etag import page_etag
+from app.core.fields import FieldSelector, FieldSet
+from app.core.lookup import in_request_order
+from app.core.pagination import DEFAULT_PAGE_SIZE, paginate
+from app.db.errors import is_unique_violation
 from app.models.book import Book
-from app.schemas.book import BookIn
+from app.models.book_copy_shard import BookCopyShard
+from app.schemas.book import BOOK_FIELD_PRESETS, BookIn, BookOut, BookRow, BookSort
+
+BOOK_SORT_COLUMNS = {
+    "id": (Book.id,),
+    "title": (Book.title, Book.id),
+    "author": (Book.author, Book.id),
+}
+
+# Everything ``BookOut`` needs and nothing more: no description, no search vector.
+BOOK_ROW_COLUMNS = (
+    Book.id,
+    Book.title,
+    Book.author,
+    Book.publication_year,
+    Book.isbn,
+    Book.available_copies,
+    Book.copy_shards,
+    Book.version,
+)
+
+book_fields = FieldSelector(BookRow, BOOK_ROW_COLUMNS, BOOK_FIELD_PRESETS)
+
+SEARCH_CONFIG = "simple"
+
+
+def book_cache_key(book_id: int) -> str:
+    return f"book:{book_id}"
 
 
 async def get_book_by_id(session: AsyncSession, book_id: int) -> Book:
@@ -17,46 +54,200 @@ async def get_book_by_id(session: AsyncSession, book_id: int) -> Book:
     return book
 
 
-async def list_books(session: AsyncSession) -> list[Book]:
-    result = await session.execute(select(Book))
-    return result.scalars().all()
+async def read_book(session: AsyncSession, book_id: int) -> BookOut:
+    """Cached variant of :func:`get_book_by_id` for read-only callers."""
+    cached = await cache.get(book_cache_key(book_id))
+    if cached is not None:
+        return BookOut.model_validate_json(cached)
 
+    book = BookOut.model_validate(await get_book_by_id(session, book_id))
+    await cache.fill(book_cache_key(book_id), book.model_dump_json().encode())
+    return book
 
-async def create_book(session: AsyncSession, book_data: BookIn) -> Book:
-    if book_data.isbn:
-        result = await session.execute(select(Book).where(Book.isbn == book_data.isbn))
-        existing_book = result.scalar_one_or_none()
-        if existing_book:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Book with this ISBN already exists",
+
+async def list_books(
+    session: AsyncSession,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: str | None = None,
+    sort: BookSort = "id",
+    fields: FieldSet = book_fields.all,
+) -> list[BookRow]:
+    """Page of books as plain rows of ``fields``; nothing enters the identity map."""
+    stmt = paginate(
+        select(*fields.columns), BOOK_SORT_COLUMNS[sort], sort=sort, limit=limit, after=after
+    )
+    result = await session.execute(stmt)
+    return fields.rows(result)
+
+
+async def lookup_books(
+    session: AsyncSession, ids: list[int], fields: FieldSet = book_fields.all
+) -> tuple[list[BookRow], list[int]]:
+    """Books with the given ids from one ``id = ANY(:ids)`` query, in request order,
+    plus the ids that do not exist. ``fields`` must include ``id``.
+    """
+    stmt = select(*fields.columns).where(Book.id == any_(bindparam("ids", ids, ARRAY(Integer))))
+    result = await session.execute(stmt)
+    return in_request_order(ids, fields.rows(result))
+
+
+async def book_page_etag(
+    session: AsyncSession,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: str | None = None,
+    sort: BookSort = "id",
+) -> str:
+    # Borrows from sharded books change availability without bumping the version.
+    return await page_etag(
+        session,
+        Book,
+        BOOK_SORT_COLUMNS[sort],
+        sort=sort,
+        limit=limit,
+        after=after,
+        fingerprint=(Book.available_copies,),
+    )
+
+
+async def search_books(
+    session: AsyncSession,
+    q: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    offset: int = 0,
+    fields: FieldSet = book_fields.all,
+) -> list[BookRow]:
+    """Rank books by full-text match on the search vector plus trigram word similarity.
+
+    ``<%`` keeps typo-tolerant matches on title and author index-assisted (GIN trigram
+    indexes), ``@@`` uses the GIN index on the generated ``search_vector`` column.
+    """
+    query = func.websearch_to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), q)
+    term = literal(q)
+    rank = func.ts_rank_cd(Book.search_vector, query) + func.greatest(
+        func.word_similarity(term, Book.title),
+        func.word_similarity(term, Book.author),
+    )
+    stmt = (
+        select(*fields.columns)
+        .where(
+            or_(
+                Book.search_vector.op("@@")(query),
+                term.op("<%")(Book.title),
+                term.op("<%")(Book.author),
             )
+        )
+        .order_by(rank.desc(), Book.id)
+        .limit(limit)
+        .offset(offset)
+    )
+    result = await session.execute(stmt)
+    return fields.rows(result)
+
+
+def _isbn_conflict() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Book with this ISBN already exists",
+    )
 
-    new_book = Book(**book_data.model_dump())
-    session.add(new_book)
+
+def split_copies(total: int, shards: int) -> list[int]:
+    """Spread ``total`` copies over ``shards`` as evenly as possible."""
+    base, extra = divmod(total, shards)
+    return [base + (shard < extra) for shard in range(shards)]
+
+
+async def redistribute_copies(session: AsyncSession, book: Book, total: int | None = None) -> None:
+    """Move a book's available copies into ``book.copy_shards`` shard rows, or back into
+    the book row when it is not sharded.
+
+    The caller must hold the lock on the book row. ``total`` defaults to the copies
+    currently available; deleting the old shards waits for in-flight claims on them, so
+    their decrements are counted.
+    """
+    deleted = await session.execute(
+        delete(BookCopyShard)
+        .where(BookCopyShard.book_id == book.id)
+        .returning(BookCopyShard.copies_count)
+    )
+    if total is None:
+        total = book.copies_count + sum(deleted.scalars())
+
+    if book.copy_shards > 1:
+        await session.execute(
+            insert(BookCopyShard),
+            [
+                {"book_id": book.id, "shard": shard, "copies_count": copies}
+                for shard, copies in enumerate(split_copies(total, book.copy_shards))
+            ],
+        )
+        stored = 0
+    else:
+        stored = total
+
+    await session.execute(
+        update(Book)
+        .where(Book.id == book.id)
+        .values(copies_count=stored)
+        .execution_options(synchronize_session=False)
+    )
+    set_committed_value(book, "copies_count", stored)
+    set_committed_value(book, "available_copies", total)
+
+
+async def create_book(session: AsyncSession, book_data: BookIn) -> Book:
+    values = book_data.model_dump()
+    values["copy_shards"] = book_data.copy_shards or settings.BOOK_COPY_SHARDS
+    stmt = (
+        insert(Book)
+        .values(**values)
+        .on_conflict_do_nothing(index_elements=[Book.isbn])
+        .returning(Book)
+    )
+    new_book = await session.scalar(stmt)
+    if new_book is None:
+        await session.rollback()
+        raise _isbn_conflict()
+
+    if new_book.copy_shards > 1:
+        await redistribute_copies(session, new_book, new_book.copies_count)
+    else:
+        set_committed_value(new_book, "available_copies", new_book.copies_count)
     await session.commit()
-    await session.refresh(new_book)
     return new_book
 
 
 async def update_book(session: AsyncSession, book_id: int, book_data: BookIn) -> Book:
-    book = await get_book_by_id(session, book_id)
-
-    if book_data.isbn:
-        result = await session.execute(select(Book).where(Book.isbn == book_data.isbn))
-        existing_book = result.scalar_one_or_none()
-        if existing_book:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Book with this ISBN already exists",
-            )
-
-    for field, value in book_data.model_dump(exclude_unset=True).items():
-        setattr(book, field, value)
+    values = book_data.model_dump(exclude_unset=True)
+    if values.get("copy_shards", 1) is None:
+        del values["copy_shards"]
+    stmt = (
+        update(Book)
+        .where(Book.id == book_id)
+        .values(**values, version=Book.version + 1)
+        .returning(Book, Book.available_copies)
+    )
+    try:
+        row = (await session.execute(stmt)).one_or_none()
+    except IntegrityError as exc:
+        await session.rollback()
+        if is_unique_violation(exc):
+            raise _isbn_conflict()
+        raise
+    if row is None:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Book not found",
+        )
 
-    session.add(book)
+    book, available = row
+    if "copy_shards" in values or (book.copy_shards > 1 and "copies_count" in values):
+        await redistribute_copies(session, book, values.get("copies_count"))
+    else:
+        set_committed_value(book, "available_copies", available)
     await session.commit()
-    await session.refresh(book)
+    await cache.delete(book_cache_key(book_id))
     return book
 
 
@@ -64,3 +255,4 @@ async def delete_book(session: AsyncSession, book_id: int) -> None:
     book = await get_book_by_id(session, book_id)
     await session.delete(book)
     await session.commit()
+    await cache.delete(book_cache_key(book_id))
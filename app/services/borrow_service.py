@@ -1,54 +1,165 @@
+import random
+from collections import defaultdict, deque
 from datetime import datetime, timezone
+from typing import Iterable
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, select
+from sqlalchemy import (
+    Integer,
+    Select,
+    column,
+    exists,
+    func,
+    insert,
+    select,
+    true,
+    tuple_,
+    union_all,
+    update,
+    values,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.orm.util import identity_key
 
+from app.core.cache import cache
 from app.models.book import Book
+from app.models.book_copy_shard import BookCopyShard
 from app.models.borrowed_book import BorrowedBook
 from app.models.user import User
-from app.schemas.borrow import BorrowRequest
+from app.schemas.book import BookRow
+from app.schemas.borrow import BatchMode, BorrowBatchItemOut, BorrowedBookOut, BorrowRequest
+from app.services.book_service import book_cache_key, book_fields
 
+MAX_ACTIVE_BORROWS = 3
 
-async def borrow_book(session: AsyncSession, data: BorrowRequest) -> BorrowedBook:
-    async with session.begin():
-        book_result = await session.execute(
-            select(Book).where(Book.id == data.book_id).with_for_update()
-        )
-        book = book_result.scalar_one_or_none()
-        if not book:
-            raise HTTPException(status_code=404, detail="Book not found")
+# Attempts to claim a copy before reporting none available; all but the last skip
+# locked shard rows instead of waiting for them.
+CLAIM_ATTEMPTS = 3
 
-        user_result = await session.execute(select(User).where(User.id == data.reader_id))
-        user = user_result.scalar_one_or_none()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
 
-        if book.copies_count < 1:
-            raise HTTPException(status_code=400, detail="No available copies")
+def _borrow_statement(data: BorrowRequest, skip_locked: bool = True) -> Select:
+    """Check, decrement and insert in a single statement.
 
-        active_borrows = await session.execute(
-            select(func.count())
-            .select_from(BorrowedBook)
-            .where(
-                BorrowedBook.reader_id == data.reader_id,
-                BorrowedBook.return_date.is_(None),
-            )
+    The reader row is locked first and its ``active_borrows`` counter is the limit check,
+    so concurrent borrows by one reader cannot overshoot the limit. A copy is claimed
+    from a random shard with available copies, skipping shards other borrows hold, or
+    from the book row when the book is not sharded. The claim only happens when every
+    precondition holds, so the lock is held for one statement instead of the whole check
+    sequence. The snapshot columns let the caller tell why nothing was inserted.
+    """
+    book = select(Book.available_copies).where(Book.id == data.book_id).cte("book")
+    reader = (
+        select(User.id, User.active_borrows)
+        .where(User.id == data.reader_id)
+        .with_for_update(key_share=True)
+        .cte("reader")
+    )
+    can_borrow = exists(select(reader.c.id).where(reader.c.active_borrows < MAX_ACTIVE_BORROWS))
+    shard = (
+        select(BookCopyShard.book_id, BookCopyShard.shard)
+        .where(
+            BookCopyShard.book_id == data.book_id,
+            BookCopyShard.copies_count > 0,
+            can_borrow,
+        )
+        .order_by(func.random())
+        .limit(1)
+        .with_for_update(skip_locked=skip_locked)
+        .cte("shard")
+    )
+    claimed_shard = (
+        update(BookCopyShard)
+        .where(
+            BookCopyShard.book_id == shard.c.book_id,
+            BookCopyShard.shard == shard.c.shard,
+        )
+        .values(copies_count=BookCopyShard.copies_count - 1)
+        .returning(BookCopyShard.book_id)
+        .cte("claimed_shard")
+    )
+    claimed_book = (
+        update(Book)
+        .where(
+            Book.id == data.book_id,
+            Book.copies_count > 0,
+            can_borrow,
+            ~exists(select(shard.c.book_id)),
         )
-        count = active_borrows.scalar()
+        .values(copies_count=Book.copies_count - 1, version=Book.version + 1)
+        .returning(Book.id)
+        .cte("claimed_book")
+    )
+    claimed = union_all(select(claimed_shard.c.book_id.label("id")), select(claimed_book.c.id)).cte(
+        "claimed"
+    )
+    counted = (
+        update(User)
+        .where(User.id == data.reader_id, exists(select(claimed.c.id)))
+        .values(active_borrows=User.active_borrows + 1)
+        .returning(User.id)
+        .cte("counted")
+    )
+    borrowed = (
+        insert(BorrowedBook)
+        .from_select(
+            ["book_id", "reader_id", "borrow_date"],
+            select(claimed.c.id, counted.c.id, func.now()).select_from(
+                claimed.join(counted, true())
+            ),
+        )
+        .returning(BorrowedBook.id, BorrowedBook.borrow_date)
+        .cte("borrowed")
+    )
+    return select(
+        select(book.c.available_copies).scalar_subquery().label("copies_count"),
+        exists(select(reader.c.id)).label("reader_exists"),
+        select(reader.c.active_borrows).scalar_subquery().label("active_borrows"),
+        select(borrowed.c.id).scalar_subquery().label("borrowed_id"),
+        select(borrowed.c.borrow_date).scalar_subquery().label("borrow_date"),
+    )
+
 
-        if count >= 3:
-            raise HTTPException(status_code=400, detail="Reader has already borrowed 3 books")
+def _expire_loaded(session: AsyncSession, model: type, pk: int, attributes: list[str]) -> None:
+    """Expire attributes of an instance the session holds after a Core-level write to its row."""
+    instance = session.identity_map.get(identity_key(model, pk))
+    if instance is not None:
+        session.expire(instance, attributes)
 
-        borrowed = BorrowedBook(book_id=data.book_id, reader_id=data.reader_id)
 
-        session.add(borrowed)
+async def borrow_book(session: AsyncSession, data: BorrowRequest) -> BorrowedBook:
+    for attempt in range(1, CLAIM_ATTEMPTS + 1):
+        last_attempt = attempt == CLAIM_ATTEMPTS
+        async with session.begin():
+            result = await session.execute(_borrow_statement(data, skip_locked=not last_attempt))
+            row = result.one()
 
-        book.copies_count -= 1
-        session.add(book)
+            if row.borrowed_id is None:
+                if row.copies_count is None:
+                    raise HTTPException(status_code=404, detail="Book not found")
+                if not row.reader_exists:
+                    raise HTTPException(status_code=404, detail="User not found")
+                if row.copies_count > 0 and row.active_borrows >= MAX_ACTIVE_BORROWS:
+                    raise HTTPException(
+                        status_code=400, detail="Reader has already borrowed 3 books"
+                    )
+                # Copies were available in the snapshot but every candidate was taken
+                # or locked by a concurrent borrow; retry, blocking on the final attempt.
+                if row.copies_count == 0 or last_attempt:
+                    raise HTTPException(status_code=400, detail="No available copies")
+        if row.borrowed_id is not None:
+            break
 
-    await session.refresh(borrowed)
-    return borrowed
+    await cache.delete(book_cache_key(data.book_id))
+    _expire_loaded(session, Book, data.book_id, ["copies_count", "available_copies", "version"])
+    _expire_loaded(session, User, data.reader_id, ["active_borrows"])
+    return BorrowedBook(
+        id=row.borrowed_id,
+        book_id=data.book_id,
+        reader_id=data.reader_id,
+        borrow_date=row.borrow_date,
+        return_date=None,
+    )
 
 
 async def return_book(session: AsyncSession, data: BorrowRequest) -> None:
@@ -58,17 +169,24 @@ async def return_book(session: AsyncSession, data: BorrowRequest) -> None:
         if not book:
             raise HTTPException(status_code=404, detail="Book not found")
 
-        user_result = await session.execute(select(User).where(User.id == data.reader_id))
+        user_result = await session.execute(
+            select(User).where(User.id == data.reader_id).with_for_update(key_share=True)
+        )
         user = user_result.scalar_one_or_none()
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
+        # A reader may hold several copies of one book; close the oldest borrow. The
+        # reader row lock above serializes concurrent returns by the same reader.
         result = await session.execute(
-            select(BorrowedBook).where(
+            select(BorrowedBook)
+            .where(
                 BorrowedBook.book_id == data.book_id,
                 BorrowedBook.reader_id == data.reader_id,
                 BorrowedBook.return_date.is_(None),
             )
+            .order_by(BorrowedBook.id)
+            .limit(1)
         )
         borrowed = result.scalar_one_or_none()
         if not borrowed:
@@ -77,14 +195,310 @@ async def return_book(session: AsyncSession, data: BorrowRequest) -> None:
                 detail="Book was not borrowed by this reader or already returned",
             )
 
-        book.copies_count += 1
+        await _return_copy(session, book)
+        user.active_borrows = User.active_borrows - 1
         borrowed.return_date = datetime.now(timezone.utc)
 
+    await cache.delete(book_cache_key(data.book_id))
+
+
+async def _return_copy(session: AsyncSession, book: Book) -> None:
+    """Put a returned copy on a random shard, or on the book row if it has no shards."""
+    if book.copy_shards > 1:
+        result = await session.execute(
+            update(BookCopyShard)
+            .where(
+                BookCopyShard.book_id == book.id,
+                BookCopyShard.shard == random.randrange(book.copy_shards),
+            )
+            .values(copies_count=BookCopyShard.copies_count + 1)
+            .execution_options(synchronize_session=False)
+        )
+        # The shard may be gone if the book was resharded meanwhile; the book row still
+        # counts towards availability, so fall through to it.
+        if result.rowcount:
+            session.expire(book, ["available_copies"])
+            return
+
+    book.copies_count = Book.copies_count + 1
+    book.version = Book.version + 1
+    session.expire(book, ["available_copies"])
+
+
+async def _lock_rows(
+    session: AsyncSession, model: type, ids: set[int], counter: InstrumentedAttribute
+) -> dict[int, int]:
+    """Lock rows in primary key order, so concurrent batches cannot deadlock each other.
+
+    ``FOR NO KEY UPDATE`` is enough for counter updates and, unlike ``FOR UPDATE``, does
+    not block the ``KEY SHARE`` locks that ``borrowed_books`` foreign keys take. A single
+    borrow locks a shard before its insert checks the book key, so a stronger lock here
+    would invert the book-then-shard order used by batches.
+    """
+    result = await session.execute(
+        select(model.id, counter)
+        .where(model.id.in_(ids))
+        .order_by(model.id)
+        .with_for_update(key_share=True)
+    )
+    return dict(result.tuples().all())
+
+
+async def _apply_deltas(
+    session: AsyncSession, counter: InstrumentedAttribute, deltas: dict[int, int], **extra
+) -> None:
+    """Add per-row deltas to ``counter`` with one ``UPDATE ... FROM (VALUES ...)``."""
+    if not deltas:
+        return
+    model = counter.class_
+    delta = values(column("id", Integer), column("delta", Integer), name="deltas").data(
+        sorted(deltas.items())
+    )
+    await session.execute(
+        update(model)
+        .where(model.id == delta.c.id)
+        .values({counter.key: counter + delta.c.delta, **extra})
+        .execution_options(synchronize_session=False)
+    )
+    for pk in deltas:
+        _expire_loaded(session, model, pk, [counter.key, *extra])
+
+
+async def _lock_shards(session: AsyncSession, book_ids: Iterable[int]) -> dict[int, dict[int, int]]:
+    """Lock the copy shards of the given books; callers lock the book rows first."""
+    result = await session.execute(
+        select(BookCopyShard.book_id, BookCopyShard.shard, BookCopyShard.copies_count)
+        .where(BookCopyShard.book_id.in_(book_ids))
+        .order_by(BookCopyShard.book_id, BookCopyShard.shard)
+        .with_for_update()
+    )
+    shards: dict[int, dict[int, int]] = defaultdict(dict)
+    for row in result:
+        shards[row.book_id][row.shard] = row.copies_count
+    return shards
+
+
+async def _apply_copy_deltas(
+    session: AsyncSession,
+    stored: dict[int, int],
+    shards: dict[int, dict[int, int]],
+    deltas: dict[int, int],
+) -> None:
+    """Apply per-book changes in available copies to the locked book rows and shards.
+
+    Borrowed copies are taken from the book row first and then from the fullest shards;
+    returned copies go to the emptiest shard, or to the book row of an unsharded book.
+    Only book-row changes bump the book version.
+    """
+    book_deltas: dict[int, int] = {}
+    shard_deltas: dict[tuple[int, int], int] = defaultdict(int)
+    for book_id, delta in deltas.items():
+        counts = dict(shards[book_id])
+        if delta < 0:
+            taken = min(-delta, stored[book_id])
+            if taken:
+                book_deltas[book_id] = -taken
+            for _ in range(-delta - taken):
+                shard = max(counts, key=counts.get)
+                counts[shard] -= 1
+                shard_deltas[(book_id, shard)] -= 1
+        elif counts:
+            for _ in range(delta):
+                shard = min(counts, key=counts.get)
+                counts[shard] += 1
+                shard_deltas[(book_id, shard)] += 1
+        else:
+            book_deltas[book_id] = delta
+
+    await _apply_deltas(session, Book.copies_count, book_deltas, version=Book.version + 1)
+    if shard_deltas:
+        delta = values(
+            column("book_id", Integer),
+            column("shard", Integer),
+            column("delta", Integer),
+            name="deltas",
+        ).data(sorted((book_id, shard, n) for (book_id, shard), n in shard_deltas.items()))
+        await session.execute(
+            update(BookCopyShard)
+            .where(BookCopyShard.book_id == delta.c.book_id, BookCopyShard.shard == delta.c.shard)
+            .values(copies_count=BookCopyShard.copies_count + delta.c.delta)
+            .execution_options(synchronize_session=False)
+        )
+    for book_id in deltas:
+        _expire_loaded(session, Book, book_id, ["available_copies"])
+
+
+def _batch_failed(results: list[BorrowBatchItemOut]) -> HTTPException | None:
+    failures = [
+        {
+            "index": index,
+            "book_id": item.book_id,
+            "reader_id": item.reader_id,
+            "detail": item.detail,
+        }
+        for index, item in enumerate(results)
+        if item.detail is not None
+    ]
+    if not failures:
+        return None
+    first = next(item for item in results if item.detail is not None)
+    return HTTPException(status_code=first.status_code, detail=failures)
+
+
+def _failed_item(item: BorrowRequest, status_code: int, detail: str) -> BorrowBatchItemOut:
+    return BorrowBatchItemOut(
+        book_id=item.book_id, reader_id=item.reader_id, status_code=status_code, detail=detail
+    )
+
+
+async def borrow_books(
+    session: AsyncSession, items: list[BorrowRequest], mode: BatchMode = "atomic"
+) -> list[BorrowBatchItemOut]:
+    """Borrow several books in one transaction.
+
+    Readers, then books, then their copy shards are locked in id order, the checks run against the locked
+    counters in request order, and the accepted items are written with one statement
+    per table. In ``atomic`` mode any failed item rolls the whole batch back; in
+    ``partial`` mode the accepted items are committed and failures are reported per item.
+    """
+    results: list[BorrowBatchItemOut] = []
+    accepted: list[int] = []
+
+    async with session.begin():
+        active = await _lock_rows(
+            session, User, {item.reader_id for item in items}, User.active_borrows
+        )
+        stored = await _lock_rows(
+            session, Book, {item.book_id for item in items}, Book.copies_count
+        )
+        shards = await _lock_shards(session, stored)
+        copies = {
+            book_id: count + sum(shards[book_id].values()) for book_id, count in stored.items()
+        }
+
+        for item in items:
+            if item.book_id not in copies:
+                results.append(_failed_item(item, 404, "Book not found"))
+            elif item.reader_id not in active:
+                results.append(_failed_item(item, 404, "User not found"))
+            elif copies[item.book_id] <= 0:
+                results.append(_failed_item(item, 400, "No available copies"))
+            elif active[item.reader_id] >= MAX_ACTIVE_BORROWS:
+                results.append(_failed_item(item, 400, "Reader has already borrowed 3 books"))
+            else:
+                copies[item.book_id] -= 1
+                active[item.reader_id] += 1
+                accepted.append(len(results))
+                results.append(
+                    BorrowBatchItemOut(
+                        book_id=item.book_id, reader_id=item.reader_id, status_code=201
+                    )
+                )
+
+        if mode == "atomic" and (error := _batch_failed(results)):
+            raise error
+
+        if accepted:
+            book_deltas: dict[int, int] = defaultdict(int)
+            reader_deltas: dict[int, int] = defaultdict(int)
+            for index in accepted:
+                book_deltas[results[index].book_id] -= 1
+                reader_deltas[results[index].reader_id] += 1
+            await _apply_deltas(session, User.active_borrows, reader_deltas)
+            await _apply_copy_deltas(session, stored, shards, book_deltas)
+
+            inserted = await session.execute(
+                insert(BorrowedBook).returning(BorrowedBook, sort_by_parameter_order=True),
+                [
+                    {"book_id": results[index].book_id, "reader_id": results[index].reader_id}
+                    for index in accepted
+                ],
+            )
+            for index, borrowed in zip(accepted, inserted.scalars()):
+                results[index].borrowed = BorrowedBookOut.model_validate(borrowed)
+
+    await cache.delete(*(book_cache_key(book_id) for book_id in copies))
+    return results
+
+
+async def return_books(
+    session: AsyncSession, items: list[BorrowRequest], mode: BatchMode = "atomic"
+) -> list[BorrowBatchItemOut]:
+    """Return several books in one transaction, with the same locking and modes as
+    :func:`borrow_books`."""
+    results: list[BorrowBatchItemOut] = []
+    returned: dict[int, int] = {}
+
+    async with session.begin():
+        readers = await _lock_rows(
+            session, User, {item.reader_id for item in items}, User.active_borrows
+        )
+        books = await _lock_rows(session, Book, {item.book_id for item in items}, Book.copies_count)
+        shards = await _lock_shards(session, books)
+
+        pairs = {(item.book_id, item.reader_id) for item in items}
+        open_borrows = await session.execute(
+            select(BorrowedBook.id, BorrowedBook.book_id, BorrowedBook.reader_id)
+            .where(
+                tuple_(BorrowedBook.book_id, BorrowedBook.reader_id).in_(pairs),
+                BorrowedBook.return_date.is_(None),
+            )
+            .order_by(BorrowedBook.id)
+            .with_for_update()
+        )
+        available: dict[tuple[int, int], deque[int]] = defaultdict(deque)
+        for row in open_borrows:
+            available[(row.book_id, row.reader_id)].append(row.id)
+
+        for item in items:
+            if item.book_id not in books:
+                results.append(_failed_item(item, 404, "Book not found"))
+            elif item.reader_id not in readers:
+                results.append(_failed_item(item, 404, "User not found"))
+            elif not available[(item.book_id, item.reader_id)]:
+                results.append(
+                    _failed_item(
+                        item, 404, "Book was not borrowed by this reader or already returned"
+                    )
+                )
+            else:
+                returned[available[(item.book_id, item.reader_id)].popleft()] = len(results)
+                results.append(
+                    BorrowBatchItemOut(
+                        book_id=item.book_id, reader_id=item.reader_id, status_code=200
+                    )
+                )
+
+        if mode == "atomic" and (error := _batch_failed(results)):
+            raise error
+
+        if returned:
+            book_deltas: dict[int, int] = defaultdict(int)
+            reader_deltas: dict[int, int] = defaultdict(int)
+            for index in returned.values():
+                book_deltas[results[index].book_id] += 1
+                reader_deltas[results[index].reader_id] -= 1
+            await _apply_deltas(session, User.active_borrows, reader_deltas)
+            await _apply_copy_deltas(session, books, shards, book_deltas)
+
+            closed = await session.execute(
+                update(BorrowedBook)
+                .where(BorrowedBook.id.in_(returned))
+                .values(return_date=func.now())
+                .returning(BorrowedBook)
+                .execution_options(synchronize_session=False, populate_existing=True)
+            )
+            for borrowed in closed.scalars():
+                results[returned[borrowed.id]].borrowed = BorrowedBookOut.model_validate(borrowed)
+
+    await cache.delete(*(book_cache_key(book_id) for book_id in books))
+    return results
+
 
-async def get_active_borrowed_books(session: AsyncSession, reader_id: int) -> list[Book]:
+async def get_active_borrowed_books(session: AsyncSession, reader_id: int) -> list[BookRow]:
     result = await session.execute(
-        select(Book)
+        select(*book_fields.all.columns)
         .join(BorrowedBook, Book.id == BorrowedBook.book_id)
         .where(BorrowedBook.reader_id == reader_id, BorrowedBook.return_date.is_(None))
     )
-    return result.scalars().all()
+    return book_fields.all.rows(result)
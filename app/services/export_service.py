@@ -0,0 +1,76 @@
+import csv
+import io
+from typing import AsyncIterator, Literal, Sequence
+
+import orjson
+from sqlalchemy import Row, Select, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models.book import Book
+from app.models.borrowed_book import BorrowedBook
+from app.models.user import User
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _encode_ndjson(rows: Sequence[Row]) -> bytes:
+    return b"".join(orjson.dumps(row._asdict()) + b"\n" for row in rows)
+
+
+def _encode_csv(rows: Sequence[Sequence]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue().encode()
+
+
+async def stream_export(
+    session_maker: async_sessionmaker, stmt: Select, fmt: ExportFormat
+) -> AsyncIterator[bytes]:
+    """Encode ``stmt`` rows batch by batch from a server-side cursor.
+
+    Opens its own session because the body is produced after the request-scoped
+    session has been closed.
+    """
+    async with session_maker() as session:
+        result = await session.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        if fmt == "csv":
+            yield _encode_csv([list(result.keys())])
+        async for rows in result.partitions():
+            yield _encode_ndjson(rows) if fmt == "ndjson" else _encode_csv(rows)
+
+
+def export_books(session_maker: async_sessionmaker, fmt: ExportFormat) -> AsyncIterator[bytes]:
+    stmt = select(
+        Book.id,
+        Book.title,
+        Book.author,
+        Book.publication_year,
+        Book.isbn,
+        Book.available_copies.label("copies_count"),
+    ).order_by(Book.id)
+    return stream_export(session_maker, stmt, fmt)
+
+
+def export_users(session_maker: async_sessionmaker, fmt: ExportFormat) -> AsyncIterator[bytes]:
+    stmt = select(User.id, User.name, User.email).order_by(User.id)
+    return stream_export(session_maker, stmt, fmt)
+
+
+def export_borrow_history(
+    session_maker: async_sessionmaker, fmt: ExportFormat
+) -> AsyncIterator[bytes]:
+    stmt = select(
+        BorrowedBook.id,
+        BorrowedBook.book_id,
+        BorrowedBook.reader_id,
+        BorrowedBook.borrow_date,
+        BorrowedBook.return_date,
+    ).order_by(BorrowedBook.id)
+    return stream_export(session_maker, stmt, fmt)
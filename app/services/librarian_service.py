@@ -1,33 +1,140 @@
+import secrets
+from datetime import datetime, timedelta, timezone
+
 from fastapi import HTTPException, status
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from app.core.security import create_access_token, hash_password, verify_password
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.security import (
+    create_access_token,
+    generate_refresh_token,
+    hash_password_async,
+    hash_refresh_token,
+    verify_password_async,
+)
 from app.models.librarian import Librarian
+from app.models.refresh_token import RefreshToken
 from app.schemas.librarian import LibrarianIn, TokenOut
 
+# Digests of refresh tokens known to be rotated or revoked. A rotated token maps to its
+# family, so a replay can still revoke the family; once the family is revoked the entry
+# maps to ``None`` and replays are rejected without a database round trip.
+revoked_refresh_tokens = LRUCache(max_entries=settings.REFRESH_TOKEN_CACHE_MAX_ENTRIES)
+
 
 async def register_librarian(data: LibrarianIn, session: AsyncSession) -> Librarian:
-    result = await session.execute(select(Librarian).where(Librarian.email == data.email))
-    existing = result.scalar_one_or_none()
-    if existing:
+    stmt = (
+        insert(Librarian)
+        .values(email=data.email, password=await hash_password_async(data.password))
+        .on_conflict_do_nothing(index_elements=[Librarian.email])
+        .returning(Librarian)
+    )
+    new_librarian = await session.scalar(stmt)
+    if new_librarian is None:
+        await session.rollback()
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
 
-    new_librarian = Librarian(email=data.email, password=hash_password(data.password))
-    session.add(new_librarian)
-
     await session.commit()
-    await session.refresh(new_librarian)
 
     return new_librarian
 
 
+async def _issue_tokens(session: AsyncSession, librarian_id: int, family: str) -> TokenOut:
+    refresh_token = generate_refresh_token()
+    session.add(
+        RefreshToken(
+            librarian_id=librarian_id,
+            token_hash=hash_refresh_token(refresh_token),
+            family=family,
+            expires_at=datetime.now(timezone.utc)
+            + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+    )
+    await session.commit()
+
+    access_token = create_access_token({"user_id": librarian_id})
+    return TokenOut(access_token=access_token, refresh_token=refresh_token)
+
+
 async def authenticate_librarian(email: str, password: str, session: AsyncSession) -> TokenOut:
     result = await session.execute(select(Librarian).where(Librarian.email == email))
     librarian = result.scalar_one_or_none()
 
-    if not librarian or not verify_password(password, librarian.password):
+    if not librarian or not await verify_password_async(password, librarian.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
-    token = create_access_token({"user_id": librarian.id})
-    return TokenOut(access_token=token)
+    return await _issue_tokens(session, librarian.id, family=secrets.token_hex(16))
+
+
+async def _revoke_family(session: AsyncSession, family: str) -> None:
+    await session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family == family, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=func.now())
+    )
+    await session.commit()
+
+
+async def refresh_access_token(refresh_token: str, session: AsyncSession) -> TokenOut:
+    """Rotate a refresh token: revoke it and issue a new pair in the same family.
+
+    This costs one indexed digest lookup instead of a password check. A token that
+    was already rotated has leaked or been replayed, so its whole family is revoked.
+    """
+    invalid_token = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+    )
+    token_hash = hash_refresh_token(refresh_token)
+    if token_hash in revoked_refresh_tokens:
+        family = revoked_refresh_tokens.get(token_hash)
+        if family is not None:
+            await _revoke_family(session, family)
+            revoked_refresh_tokens.set(token_hash, None)
+        raise invalid_token
+
+    result = await session.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > func.now(),
+        )
+        .values(revoked_at=func.now())
+        .returning(RefreshToken.librarian_id, RefreshToken.family)
+    )
+    rotated = result.one_or_none()
+    if rotated is None:
+        result = await session.execute(
+            select(RefreshToken.family, RefreshToken.revoked_at).where(
+                RefreshToken.token_hash == token_hash
+            )
+        )
+        stale = result.one_or_none()
+        if stale is not None and stale.revoked_at is not None:
+            await _revoke_family(session, stale.family)
+            revoked_refresh_tokens.set(token_hash, None)
+        else:
+            await session.rollback()
+        raise invalid_token
+
+    tokens = await _issue_tokens(session, rotated.librarian_id, rotated.family)
+    revoked_refresh_tokens.set(token_hash, rotated.family)
+    return tokens
+
+
+async def revoke_refresh_token(refresh_token: str, session: AsyncSession) -> None:
+    """Log out: revoke the token and every token rotated from the same login."""
+    token_hash = hash_refresh_token(refresh_token)
+    family = await session.scalar(
+        select(RefreshToken.family).where(RefreshToken.token_hash == token_hash)
+    )
+    if family is None:
+        await session.rollback()
+        return
+    await _revoke_family(session, family)
+    revoked_refresh_tokens.set(token_hash, None)
@@ -0,0 +1,107 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import exists, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.bloom import BloomFilter
+from app.core.config import settings
+from app.core.metrics import Counter, registry
+from app.models.revoked_token import RevokedToken
+
+# Revocations committed up to this long after their ``revoked_at`` are still picked up
+# by re-reading this far behind the previous refresh.
+REFRESH_LOOKBACK = timedelta(minutes=1)
+
+revocation_checks = registry.register(
+    Counter(
+        "token_revocation_checks_total",
+        "Access token revocation checks by outcome.",
+        ["result"],
+    )
+)
+
+
+class RevocationFilter:
+    """Per-worker Bloom filter of revoked token ids.
+
+    A miss proves the token is not revoked, so the common case needs no I/O. The filter
+    is topped up with new revocations at most every ``refresh_interval`` seconds and
+    rebuilt from unexpired rows once it holds ``capacity`` entries.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, refresh_interval: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.watermark: datetime | None = None
+        self.refreshed_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    def _stale(self) -> bool:
+        return time.monotonic() - self.refreshed_at >= self.refresh_interval
+
+    async def refresh(self, session: AsyncSession, force: bool = False) -> None:
+        if not force and not self._stale():
+            return
+        async with self._lock:
+            if not force and not self._stale():
+                return
+
+            rebuild = self.watermark is None or self.bloom.count >= self.capacity
+            condition = RevokedToken.expires_at > func.now()
+            if not rebuild:
+                condition &= RevokedToken.revoked_at >= self.watermark - REFRESH_LOOKBACK
+            # Joined onto the database clock, so the next watermark is on the same clock
+            # as ``revoked_at`` and is known even when nothing has been revoked yet.
+            clock = select(func.now().label("now")).subquery("clock")
+            stmt = select(clock.c.now, RevokedToken.jti).select_from(
+                clock.outerjoin(RevokedToken, condition)
+            )
+            result = await session.execute(stmt)
+            rows = result.all()
+            await session.commit()
+
+            bloom = BloomFilter(self.capacity, self.error_rate) if rebuild else self.bloom
+            for _, jti in rows:
+                if jti is not None:
+                    bloom.add(jti)
+            self.watermark = rows[0].now
+            self.bloom = bloom
+            self.refreshed_at = time.monotonic()
+
+    def add(self, jti: str) -> None:
+        self.bloom.add(jti)
+
+
+revocation_filter = RevocationFilter(
+    capacity=settings.TOKEN_REVOCATION_FILTER_CAPACITY,
+    error_rate=settings.TOKEN_REVOCATION_FILTER_ERROR_RATE,
+    refresh_interval=settings.TOKEN_REVOCATION_REFRESH_SECONDS,
+)
+
+
+async def revoke_token(session: AsyncSession, jti: str, expires_at: datetime) -> None:
+    await session.execute(
+        insert(RevokedToken)
+        .values(jti=jti, expires_at=expires_at)
+        .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+    )
+    await session.commit()
+    revocation_filter.add(jti)
+
+
+async def is_token_revoked(session: AsyncSession, jti: str) -> bool:
+    """Only Bloom filter hits fall through to an exact lookup."""
+    await revocation_filter.refresh(session)
+    if jti not in revocation_filter.bloom:
+        revocation_checks.inc(result="absent")
+        return False
+
+    revoked = await session.scalar(select(exists().where(RevokedToken.jti == jti)))
+    await session.commit()
+    revocation_checks.inc(result="revoked" if revoked else "false_positive")
+    return revoked
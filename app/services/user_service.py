@@ -1,9 +1,30 @@
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import Integer, any_, bindparam, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import cache
+from app.core.etag import page_etag
+from app.core.fields import FieldSelector, FieldSet
+from app.core.lookup import in_request_order
+from app.core.pagination import DEFAULT_PAGE_SIZE, paginate
+from app.db.errors import is_unique_violation
 from app.models.user import User
-from app.schemas.user import UserIn
+from app.schemas.user import USER_FIELD_PRESETS, UserIn, UserOut, UserRow, UserSort
+
+USER_ROW_COLUMNS = (User.id, User.name, User.email, User.version)
+
+user_fields = FieldSelector(UserRow, USER_ROW_COLUMNS, USER_FIELD_PRESETS)
+
+USER_SORT_COLUMNS = {
+    "id": (User.id,),
+    "name": (User.name, User.id),
+}
+
+
+def user_cache_key(user_id: int) -> str:
+    return f"user:{user_id}"
 
 
 async def get_user_by_id(session: AsyncSession, user_id: int) -> User:
@@ -17,45 +38,100 @@ async def get_user_by_id(session: AsyncSession, user_id: int) -> User:
     return user
 
 
-async def list_users(session: AsyncSession) -> list[User]:
-    result = await session.execute(select(User))
-    return result.scalars().all()
+async def read_user(session: AsyncSession, user_id: int) -> UserOut:
+    """Cached variant of :func:`get_user_by_id` for read-only callers."""
+    cached = await cache.get(user_cache_key(user_id))
+    if cached is not None:
+        return UserOut.model_validate_json(cached)
+
+    user = UserOut.model_validate(await get_user_by_id(session, user_id))
+    await cache.fill(user_cache_key(user_id), user.model_dump_json().encode())
+    return user
+
+
+async def list_users(
+    session: AsyncSession,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: str | None = None,
+    sort: UserSort = "id",
+    fields: FieldSet = user_fields.all,
+) -> list[UserRow]:
+    """Page of users as plain rows of ``fields``; nothing enters the identity map."""
+    stmt = paginate(
+        select(*fields.columns), USER_SORT_COLUMNS[sort], sort=sort, limit=limit, after=after
+    )
+    result = await session.execute(stmt)
+    return fields.rows(result)
+
+
+async def lookup_users(
+    session: AsyncSession, ids: list[int], fields: FieldSet = user_fields.all
+) -> tuple[list[UserRow], list[int]]:
+    """Users with the given ids from one ``id = ANY(:ids)`` query, in request order,
+    plus the ids that do not exist. ``fields`` must include ``id``.
+    """
+    stmt = select(*fields.columns).where(User.id == any_(bindparam("ids", ids, ARRAY(Integer))))
+    result = await session.execute(stmt)
+    return in_request_order(ids, fields.rows(result))
+
+
+async def user_page_etag(
+    session: AsyncSession,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: str | None = None,
+    sort: UserSort = "id",
+) -> str:
+    return await page_etag(
+        session, User, USER_SORT_COLUMNS[sort], sort=sort, limit=limit, after=after
+    )
+
+
+def _email_conflict() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="User with this email already exists",
+    )
 
 
 async def create_user(session: AsyncSession, user_data: UserIn) -> User:
-    result = await session.execute(select(User).where(User.email == user_data.email))
-    existing_user = result.scalar_one_or_none()
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="User with this email already exists",
-        )
+    stmt = (
+        insert(User)
+        .values(**user_data.model_dump())
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User)
+    )
+    new_user = await session.scalar(stmt)
+    if new_user is None:
+        await session.rollback()
+        raise _email_conflict()
 
-    new_user = User(**user_data.model_dump())
-    session.add(new_user)
     await session.commit()
-    await session.refresh(new_user)
     return new_user
 
 
 async def update_user(session: AsyncSession, user_id: int, user_data: UserIn) -> User:
-    user = await get_user_by_id(session, user_id)
-
-    if user_data.email:
-        result = await session.execute(select(User).where(User.email == user_data.email))
-        existing_user = result.scalar_one_or_none()
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="User with this email already exists",
-            )
-
-    for field, value in user_data.model_dump(exclude_unset=True).items():
-        setattr(user, field, value)
+    stmt = (
+        update(User)
+        .where(User.id == user_id)
+        .values(**user_data.model_dump(exclude_unset=True), version=User.version + 1)
+        .returning(User)
+    )
+    try:
+        user = await session.scalar(stmt)
+    except IntegrityError as exc:
+        await session.rollback()
+        if is_unique_violation(exc):
+            raise _email_conflict()
+        raise
+    if user is None:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
 
-    session.add(user)
     await session.commit()
-    await session.refresh(user)
+    await cache.delete(user_cache_key(user_id))
     return user
 
 
@@ -63,3 +139,4 @@ async def delete_user(session: AsyncSession, user_id: int) -> None:
     user = await get_user_by_id(session, user_id)
     await session.delete(user)
     await session.commit()
+    await cache.delete(user_cache_key(user_id))
@@ -0,0 +1,89 @@
+"""Per-row cost of list reads: ORM entities versus column selects into slotted rows.
+
+The ORM path loads ``Book`` entities into the identity map and validates them into
+``BookOut``; the row path selects only the ``BookOut`` columns into ``BookRow`` and
+dumps them without validation. Both include the query. Runs against the test
+database, creating and dropping the schema, so it must not hold data you need.
+
+    python -m benchmarks.bench_read_path
+"""
+
+import asyncio
+import time
+import tracemalloc
+
+from app.core.config import settings
+from app.core.serialization import JSONSerializer
+from app.models.base import Base
+from app.models.book import Book
+from app.schemas.book import BookOut
+from app.services.book_service import book_fields, list_books
+from sqlalchemy import NullPool, insert, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+ROWS = 500
+ROUNDS = 50
+
+book_list_serializer = JSONSerializer(list[BookOut])
+
+
+async def orm_path(session) -> bytes:
+    books = (await session.execute(select(Book).order_by(Book.id).limit(ROWS))).scalars().all()
+    body = book_list_serializer.dump(books)
+    session.expunge_all()
+    return body
+
+
+async def row_path(session) -> bytes:
+    books = await list_books(session, limit=ROWS)
+    return book_fields.all.list_serializer.dump(books, trusted=True)
+
+
+async def measure(sessions, path) -> tuple[float, float]:
+    async with sessions() as session:
+        await path(session)
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            await path(session)
+        elapsed = time.perf_counter() - started
+
+        tracemalloc.start()
+        await path(session)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed / ROUNDS / ROWS * 1e6, peak / ROWS
+
+
+async def main() -> None:
+    engine = create_async_engine(settings.TEST_POSTGRES_URL_ASYNC, poolclass=NullPool)
+    sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with engine.begin() as connection:
+        await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(
+            insert(Book),
+            [
+                {
+                    "title": f"Title {i}",
+                    "author": f"Author {i % 97}",
+                    "isbn": f"978{i:010d}",
+                    "description": "A long description. " * 20,
+                }
+                for i in range(ROWS)
+            ],
+        )
+    try:
+        async with sessions() as session:
+            assert await orm_path(session) == await row_path(session)
+        print(f"{'path':>6} {'us/row':>8} {'peak bytes/row':>15}")
+        for name, path in (("orm", orm_path), ("rows", row_path)):
+            per_row, peak = await measure(sessions, path)
+            print(f"{name:>6} {per_row:>8.2f} {peak:>15.0f}")
+    finally:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""Per-row cost of rendering ``list[BookOut]`` responses.
+
+Compares FastAPI's default path (validate against ``response_model``, convert to
+primitives, encode with ``json``) with the ORJSON default response class and with
+``JSONSerializer``, which validates from attributes once and dumps bytes directly, and
+with ``trusted=True`` for data that is already ``BookOut``, as cached reads are.
+
+    python -m benchmarks.bench_serialization
+"""
+
+import asyncio
+import timeit
+from types import SimpleNamespace
+
+import orjson
+from app.core.serialization import JSONSerializer
+from app.schemas.book import BookOut
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+ROW_COUNTS = (1, 50, 500)
+
+book_list_serializer = JSONSerializer(list[BookOut])
+
+
+def make_rows(count: int) -> list[SimpleNamespace]:
+    """Attribute bags shaped like loaded ``Book`` rows."""
+    return [
+        SimpleNamespace(
+            id=i,
+            title=f"Title {i}",
+            author=f"Author {i % 97}",
+            publication_year=1900 + i % 120,
+            isbn=f"978{i:010d}",
+            available_copies=i % 7,
+            copies_count=i % 7,
+            copy_shards=1,
+            version=1,
+        )
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    field = create_model_field("response", list[BookOut], mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    def fastapi_default(rows):
+        content = loop.run_until_complete(serialize_response(field=field, response_content=rows))
+        return JSONResponse(content).body
+
+    def fastapi_orjson(rows):
+        content = loop.run_until_complete(serialize_response(field=field, response_content=rows))
+        return ORJSONResponse(content).body
+
+    def serializer(rows):
+        return book_list_serializer.response(rows).body
+
+    def serializer_trusted(rows):
+        return book_list_serializer.response(rows, trusted=True).body
+
+    paths = {
+        "fastapi+json": fastapi_default,
+        "fastapi+orjson": fastapi_orjson,
+        "serializer": serializer,
+    }
+    print(f"{'rows':>6} {'path':>16} {'us/row':>10} {'speedup':>8}")
+    for count in ROW_COUNTS:
+        rows = make_rows(count)
+        assert len({orjson.dumps(orjson.loads(path(rows))) for path in paths.values()}) == 1
+        validated = [BookOut.model_validate(row) for row in rows]
+        assert serializer_trusted(validated) == serializer(rows)
+        number = max(1, 20_000 // count)
+        baseline = None
+        for name, path in paths.items():
+            best = min(timeit.repeat(lambda: path(rows), number=number, repeat=5))
+            per_row = best / number / count * 1e6
+            baseline = baseline or per_row
+            print(f"{count:>6} {name:>16} {per_row:>10.2f} {baseline / per_row:>7.1f}x")
+        best = min(timeit.repeat(lambda: serializer_trusted(validated), number=number, repeat=5))
+        per_row = best / number / count * 1e6
+        print(f"{count:>6} {'trusted':>16} {per_row:>10.2f} {baseline / per_row:>7.1f}x")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
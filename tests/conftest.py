@@ -1,16 +1,23 @@
+from contextlib import contextmanager
 from typing import AsyncGenerator
 
 import pytest
+from app.core.cache import cache
 from app.core.config import settings
-from app.db.database import get_db
+from app.db.database import get_db, get_replica_router, get_session_maker
+from app.db.query_stats import track_queries
+from app.db.replicas import ReplicaRouter
+from app.db.session import ReleasingSession
 from app.main import app
 from app.models.base import Base
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy import NullPool
+from sqlalchemy import NullPool, text
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 engine_null_pool = create_async_engine(settings.TEST_POSTGRES_URL_ASYNC, poolclass=NullPool)
-async_session_maker_null_pool = async_sessionmaker(bind=engine_null_pool, expire_on_commit=False)
+async_session_maker_null_pool = async_sessionmaker(
+    bind=engine_null_pool, class_=ReleasingSession, expire_on_commit=False
+)
 
 
 async def get_db_null_pool():
@@ -25,11 +32,17 @@ async def db():
 
 
 app.dependency_overrides[get_db] = get_db_null_pool
+app.dependency_overrides[get_session_maker] = lambda: async_session_maker_null_pool
+# Reads go to the primary unless a test routes them to replicas explicitly.
+app.dependency_overrides[get_replica_router] = lambda: ReplicaRouter(
+    [], max_lag=0, check_interval=0
+)
 
 
 @pytest.fixture(scope="session", autouse=True)
 async def setup_database():
     async with engine_null_pool.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
 
@@ -39,7 +52,32 @@ async def setup_database():
         await conn.run_sync(Base.metadata.drop_all)
 
 
+@pytest.fixture(autouse=True)
+async def clear_cache():
+    await cache.clear()
+
+
 @pytest.fixture(scope="session")
 async def ac() -> AsyncGenerator[AsyncClient, None]:
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test/api/v1") as ac:
         yield ac
+
+
+@pytest.fixture
+def query_budget():
+    """Fail when the wrapped block issues more SQL statements than the endpoint's budget.
+
+    Authenticated requests may spend one extra statement refreshing the token
+    revocation filter, so budgets for them include that slack.
+    """
+
+    @contextmanager
+    def budget(max_queries: int):
+        with track_queries(record_statements=True) as stats:
+            yield stats
+        assert stats.count <= max_queries, (
+            f"{stats.count} queries exceed the budget of {max_queries}:\n"
+            + "\n".join(stats.statements)
+        )
+
+    return budget
@@ -26,7 +26,7 @@ async def clear_tables(db: AsyncSession):
     await db.commit()
 
 
-async def test_read_books_with_auth(ac: AsyncClient, db: AsyncSession):
+async def test_read_books_with_auth(ac: AsyncClient, db: AsyncSession, query_budget):
     email = "librarian@example.com"
     password = "strongpassword"
     librarian = Librarian(email=email, password=hash_password(password))
@@ -50,7 +50,8 @@ async def test_read_books_with_auth(ac: AsyncClient, db: AsyncSession):
     await db.refresh(book1)
     await db.refresh(book2)
 
-    response = await ac.get("/books/", headers=headers)
+    with query_budget(3):
+        response = await ac.get("/books/", headers=headers)
     assert response.status_code == 200
 
     data = response.json()
@@ -60,7 +61,105 @@ async def test_read_books_with_auth(ac: AsyncClient, db: AsyncSession):
     assert "Book Two" in titles
 
 
-async def test_get_book_by_id_with_auth(ac: AsyncClient, db: AsyncSession):
+async def test_read_books_paginated_with_auth(ac: AsyncClient, db: AsyncSession):
+    email = "librarian@example.com"
+    password = "strongpassword"
+    librarian = Librarian(email=email, password=hash_password(password))
+    db.add(librarian)
+    await db.commit()
+    await db.refresh(librarian)
+
+    login_data = {
+        "username": email,
+        "password": password,
+    }
+    login_resp = await ac.post("/librarians/login", data=login_data)
+    assert login_resp.status_code == 200
+    token = login_resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    db.add_all([Book(title=f"Book {i}", author="Author") for i in range(3)])
+    await db.commit()
+
+    response = await ac.get("/books/", params={"limit": 2}, headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = await ac.get("/books/", params={"limit": 2, "after": cursor}, headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert "X-Next-Cursor" not in response.headers
+
+    response = await ac.get("/books/", params={"after": "not-a-cursor"}, headers=headers)
+    assert response.status_code == 400
+
+
+async def test_search_books_with_auth(ac: AsyncClient, db: AsyncSession):
+    email = "librarian@example.com"
+    password = "strongpassword"
+    librarian = Librarian(email=email, password=hash_password(password))
+    db.add(librarian)
+    await db.commit()
+    await db.refresh(librarian)
+
+    login_data = {
+        "username": email,
+        "password": password,
+    }
+    login_resp = await ac.post("/librarians/login", data=login_data)
+    assert login_resp.status_code == 200
+    token = login_resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    db.add_all(
+        [
+            Book(title="Crime and Punishment", author="Fyodor Dostoevsky"),
+            Book(title="War and Peace", author="Leo Tolstoy"),
+        ]
+    )
+    await db.commit()
+
+    response = await ac.get("/books/search", params={"q": "Dostoevsky"}, headers=headers)
+    assert response.status_code == 200
+    assert [book["title"] for book in response.json()] == ["Crime and Punishment"]
+
+    response = await ac.get("/books/search", headers=headers)
+    assert response.status_code == 422
+
+
+async def test_export_books_with_auth(ac: AsyncClient, db: AsyncSession):
+    email = "librarian@example.com"
+    password = "strongpassword"
+    librarian = Librarian(email=email, password=hash_password(password))
+    db.add(librarian)
+    await db.commit()
+    await db.refresh(librarian)
+
+    login_data = {
+        "username": email,
+        "password": password,
+    }
+    login_resp = await ac.post("/librarians/login", data=login_data)
+    assert login_resp.status_code == 200
+    token = login_resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    db.add_all(
+        [Book(title="Book One", author="Author A"), Book(title="Book Two", author="Author B")]
+    )
+    await db.commit()
+
+    response = await ac.get("/books/export", params={"format": "csv"}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    lines = response.text.splitlines()
+    assert lines[0] == "id,title,author,publication_year,isbn,copies_count"
+    assert len(lines) == 3
+
+
+async def test_get_book_by_id_with_auth(ac: AsyncClient, db: AsyncSession, query_budget):
     email = "librarian@example.com"
     password = "strongpassword"
     librarian = Librarian(email=email, password=hash_password(password))
@@ -82,8 +181,10 @@ async def test_get_book_by_id_with_auth(ac: AsyncClient, db: AsyncSession):
     await db.commit()
     await db.refresh(book)
 
-    response = await ac.get(f"/books/{book.id}", headers=headers)
+    with query_budget(2):
+        response = await ac.get(f"/books/{book.id}", headers=headers)
     assert response.status_code == 200
+    assert response.headers["Server-Timing"].startswith("db;dur=")
 
     data = response.json()
     assert data["id"] == book.id
@@ -149,7 +250,43 @@ async def test_create_new_book_auth(
     assert book.author == book_payload["author"]
 
 
-async def test_update_existing_book_auth(ac: AsyncClient, db: AsyncSession):
+async def test_import_books_auth(ac: AsyncClient, db: AsyncSession):
+    email = "librarian@example.com"
+    password = "strongpassword"
+    librarian = Librarian(email=email, password=hash_password(password))
+    db.add(librarian)
+    await db.commit()
+    await db.refresh(librarian)
+
+    login_data = {
+        "username": email,
+        "password": password,
+    }
+    login_resp = await ac.post("/librarians/login", data=login_data)
+    assert login_resp.status_code == 200
+    token = login_resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    payload = "title,author,isbn\nBook One,Author A,111\nBook Two,,222\n"
+
+    response = await ac.post(
+        "/books/import",
+        params={"format": "csv"},
+        content=payload,
+        headers={**headers, "Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["received"] == 2
+    assert data["inserted"] == 1
+    assert data["errors"][0]["row"] == 2
+
+    result = await db.execute(select(Book).where(Book.isbn == "111"))
+    assert result.scalar_one_or_none() is not None
+
+
+async def test_update_existing_book_auth(ac: AsyncClient, db: AsyncSession, query_budget):
     email = "librarian@example.com"
     password = "strongpassword"
     librarian = Librarian(email=email, password=hash_password(password))
@@ -173,7 +310,8 @@ async def test_update_existing_book_auth(ac: AsyncClient, db: AsyncSession):
 
     update_payload = {"title": "Updated Title", "author": "Updated Author"}
 
-    response = await ac.put(f"/books/{book.id}", json=update_payload, headers=headers)
+    with query_budget(2):
+        response = await ac.put(f"/books/{book.id}", json=update_payload, headers=headers)
     assert response.status_code == 200
 
     data = response.json()
@@ -257,3 +395,143 @@ async def test_delete_existing_book_auth(ac: AsyncClient, db: AsyncSession):
     result = await db.execute(select(Book).where(Book.id == book.id))
     deleted_book = result.scalar_one_or_none()
     assert deleted_book is None
+
+
+async def test_conditional_get_books_with_auth(ac: AsyncClient, db: AsyncSession):
+    email = "librarian@example.com"
+    password = "strongpassword"
+    librarian = Librarian(email=email, password=hash_password(password))
+    db.add(librarian)
+    await db.commit()
+
+    login_data = {
+        "username": email,
+        "password": password,
+    }
+    login_resp = await ac.post("/librarians/login", data=login_data)
+    assert login_resp.status_code == 200
+    token = login_resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    book = Book(title="Polled Book", author="Author")
+    db.add(book)
+    await db.commit()
+    await db.refresh(book)
+
+    response = await ac.get(f"/books/{book.id}", headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    list_response = await ac.get("/books/", headers=headers)
+    list_etag = list_response.headers["ETag"]
+
+    response = await ac.get(f"/books/{book.id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    response = await ac.get("/books/", headers={**headers, "If-None-Match": list_etag})
+    assert response.status_code == 304
+
+    update_resp = await ac.patch(f"/books/{book.id}", json={"copies_count": 5}, headers=headers)
+    assert update_resp.json()["version"] == 2
+
+    response = await ac.get(f"/books/{book.id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    response = await ac.get("/books/", headers={**headers, "If-None-Match": list_etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != list_etag
+
+
+async def test_read_books_sparse_fields_with_auth(ac: AsyncClient, db: AsyncSession):
+    email = "librarian@example.com"
+    password = "strongpassword"
+    librarian = Librarian(email=email, password=hash_password(password))
+    db.add(librarian)
+    await db.commit()
+
+    login_data = {
+        "username": email,
+        "password": password,
+    }
+    login_resp = await ac.post("/librarians/login", data=login_data)
+    token = login_resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    book = Book(title="Kiosk Book", author="Author", copies_count=3)
+    db.add(book)
+    await db.commit()
+    await db.refresh(book)
+
+    full = await ac.get("/books/", headers=headers)
+    response = await ac.get("/books/", params={"fields": "kiosk"}, headers=headers)
+    assert response.json() == [{"id": book.id, "title": "Kiosk Book", "copies_count": 3}]
+    assert response.headers["ETag"] != full.headers["ETag"]
+
+    response = await ac.get("/books/", params={"fields": "isbn", "sort": "author"}, headers=headers)
+    assert response.json() == [{"id": book.id, "author": "Author", "isbn": None}]
+
+    response = await ac.get(f"/books/{book.id}", params={"fields": "title"}, headers=headers)
+    assert response.json() == {"title": "Kiosk Book"}
+
+    response = await ac.get("/books/", params={"fields": "description"}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown field: description"
+
+
+async def test_lookup_books_by_ids_with_auth(ac: AsyncClient, db: AsyncSession, query_budget):
+    email = "librarian@example.com"
+    password = "strongpassword"
+    librarian = Librarian(email=email, password=hash_password(password))
+    db.add(librarian)
+    await db.commit()
+
+    login_data = {
+        "username": email,
+        "password": password,
+    }
+    login_resp = await ac.post("/librarians/login", data=login_data)
+    token = login_resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    first = Book(title="First", author="Author", copies_count=1)
+    second = Book(title="Second", author="Author", copies_count=2)
+    db.add_all([first, second])
+    await db.commit()
+    missing_id = second.id + 1000
+
+    ids = f"{second.id},{missing_id},{first.id},{second.id}"
+    with query_budget(2):
+        response = await ac.get("/books/", params={"ids": ids}, headers=headers)
+    assert response.status_code == 200
+    assert [book["title"] for book in response.json()] == ["Second", "First"]
+    assert response.headers["X-Missing-Ids"] == str(missing_id)
+    assert "ETag" not in response.headers
+
+    with query_budget(2):
+        response = await ac.post(
+            "/books/lookup",
+            params={"fields": "kiosk"},
+            json={"ids": [first.id, missing_id, second.id]},
+            headers=headers,
+        )
+    assert response.status_code == 200
+    assert response.json() == {
+        "items": [
+            {"id": first.id, "title": "First", "copies_count": 1},
+            {"id": second.id, "title": "Second", "copies_count": 2},
+        ],
+        "missing": [missing_id],
+    }
+
+    response = await ac.get("/books/", params={"ids": "1,x"}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid ids"
+
+    response = await ac.get("/books/", params={"ids": "1,99999999999"}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid ids"
+
+    response = await ac.post("/books/lookup", json={"ids": []}, headers=headers)
+    assert response.status_code == 422
+
+    response = await ac.post("/books/lookup", json={"ids": [1, 3000000000]}, headers=headers)
+    assert response.status_code == 422
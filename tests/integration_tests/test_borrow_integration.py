@@ -28,7 +28,7 @@ async def clear_tables(db: AsyncSession):
     await db.commit()
 
 
-async def test_borrow_book_auth(ac: AsyncClient, db: AsyncSession):
+async def test_borrow_book_auth(ac: AsyncClient, db: AsyncSession, query_budget):
     email = "librarian@example.com"
     password = "strongpassword"
     librarian = Librarian(email=email, password=hash_password(password))
@@ -55,7 +55,8 @@ async def test_borrow_book_auth(ac: AsyncClient, db: AsyncSession):
 
     borrow_payload = {"book_id": book.id, "reader_id": user.id}
 
-    response = await ac.post("/borrow/", json=borrow_payload, headers=headers)
+    with query_budget(2):
+        response = await ac.post("/borrow/", json=borrow_payload, headers=headers)
     assert response.status_code == 201
 
     data = response.json()
@@ -79,7 +80,7 @@ async def test_borrow_book_auth(ac: AsyncClient, db: AsyncSession):
     assert borrowed_book is not None
 
 
-async def test_return_borrowed_book_auth(ac: AsyncClient, db: AsyncSession):
+async def test_return_borrowed_book_auth(ac: AsyncClient, db: AsyncSession, query_budget):
     email = "librarian@example.com"
     password = "strongpassword"
     librarian = Librarian(email=email, password=hash_password(password))
@@ -92,7 +93,7 @@ async def test_return_borrowed_book_auth(ac: AsyncClient, db: AsyncSession):
     token = login_resp.json()["access_token"]
     headers = {"Authorization": f"Bearer {token}"}
 
-    user = User(name="Reader", email="reader@example.com")
+    user = User(name="Reader", email="reader@example.com", active_borrows=1)
     book_copies_count = 1
     book = Book(title="Test Book", author="Author", copies_count=book_copies_count)
     db.add_all([user, book])
@@ -109,7 +110,8 @@ async def test_return_borrowed_book_auth(ac: AsyncClient, db: AsyncSession):
 
     payload = {"book_id": book.id, "reader_id": user.id}
 
-    response = await ac.post("/borrow/return", json=payload, headers=headers)
+    with query_budget(7):
+        response = await ac.post("/borrow/return", json=payload, headers=headers)
     assert response.status_code == 200
     assert response.json() == {"detail": "Book returned successfully"}
 
@@ -129,7 +131,7 @@ async def test_return_borrowed_book_auth(ac: AsyncClient, db: AsyncSession):
     assert borrowed_record.return_date is not None
 
 
-async def test_list_borrowed_books_by_user_auth(ac: AsyncClient, db: AsyncSession):
+async def test_list_borrowed_books_by_user_auth(ac: AsyncClient, db: AsyncSession, query_budget):
     email = "librarian@example.com"
     password = "strongpassword"
     librarian = Librarian(email=email, password=hash_password(password))
@@ -160,7 +162,8 @@ async def test_list_borrowed_books_by_user_auth(ac: AsyncClient, db: AsyncSessio
     db.add_all([borrowed1, borrowed2])
     await db.commit()
 
-    response = await ac.get(f"/borrow/{user.id}", headers=headers)
+    with query_budget(2):
+        response = await ac.get(f"/borrow/{user.id}", headers=headers)
 
     assert response.status_code == 200
     data = response.json()
@@ -171,3 +174,35 @@ async def test_list_borrowed_books_by_user_auth(ac: AsyncClient, db: AsyncSessio
     titles = {book["title"] for book in data}
     assert book1.title in titles
     assert book2.title in titles
+
+
+async def test_borrow_and_return_batch_auth(ac: AsyncClient, db: AsyncSession):
+    email = "librarian@example.com"
+    password = "strongpassword"
+    librarian = Librarian(email=email, password=hash_password(password))
+    db.add(librarian)
+    await db.commit()
+
+    login_resp = await ac.post("/librarians/login", data={"username": email, "password": password})
+    assert login_resp.status_code == 200
+    token = login_resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    user = User(name="Reader", email="reader@example.com")
+    books = [Book(title=f"Book {i}", author="Author", copies_count=1) for i in range(2)]
+    db.add_all([user, *books])
+    await db.commit()
+
+    payload = {"items": [{"book_id": book.id, "reader_id": user.id} for book in books]}
+
+    response = await ac.post("/borrow/batch", json=payload, headers=headers)
+    assert response.status_code == 200
+    assert [item["status_code"] for item in response.json()] == [201, 201]
+
+    response = await ac.post("/borrow/batch", json=payload, headers=headers)
+    assert response.status_code == 400
+    assert [failure["index"] for failure in response.json()["detail"]] == [0, 1]
+
+    response = await ac.post("/borrow/return/batch", json=payload, headers=headers)
+    assert response.status_code == 200
+    assert all(item["borrowed"]["return_date"] for item in response.json())
@@ -56,7 +56,7 @@ async def test_register_email_conflict(ac: AsyncClient, db: AsyncSession):
     assert data["detail"] == "Email already registered"
 
 
-async def test_login_success(ac: AsyncClient, db: AsyncSession):
+async def test_login_success(ac: AsyncClient, db: AsyncSession, query_budget):
     email = "test_login@example.com"
     raw_password = "securepassword"
     hashed = hash_password(raw_password)
@@ -67,7 +67,8 @@ async def test_login_success(ac: AsyncClient, db: AsyncSession):
 
     login_data = {"username": email, "password": raw_password}
 
-    response = await ac.post("/librarians/login", data=login_data)
+    with query_budget(2):
+        response = await ac.post("/librarians/login", data=login_data)
 
     assert response.status_code == 200
     data = response.json()
@@ -111,3 +112,91 @@ async def test_login_fail_user_not_found(ac: AsyncClient, db: AsyncSession):
     response = await ac.post("/librarians/login", data=login_data)
     assert response.status_code == 401
     assert response.json()["detail"] == "Invalid credentials"
+
+
+async def test_refresh_rotates_and_detects_reuse(ac: AsyncClient, db: AsyncSession):
+    email = "test_refresh@example.com"
+    raw_password = "securepassword"
+    librarian = Librarian(email=email, password=hash_password(raw_password))
+    db.add(librarian)
+    await db.commit()
+
+    login_data = {"username": email, "password": raw_password}
+    response = await ac.post("/librarians/login", data=login_data)
+    first = response.json()["refresh_token"]
+
+    response = await ac.post("/librarians/refresh", json={"refresh_token": first})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["access_token"]
+    second = data["refresh_token"]
+    assert second != first
+
+    headers = {"Authorization": f"Bearer {data['access_token']}"}
+    assert (await ac.get("/books/", headers=headers)).status_code == 200
+
+    response = await ac.post("/librarians/refresh", json={"refresh_token": first})
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Invalid refresh token"
+
+    response = await ac.post("/librarians/refresh", json={"refresh_token": second})
+    assert response.status_code == 401
+
+
+async def test_logout_revokes_refresh_token(ac: AsyncClient, db: AsyncSession):
+    email = "test_logout@example.com"
+    raw_password = "securepassword"
+    librarian = Librarian(email=email, password=hash_password(raw_password))
+    db.add(librarian)
+    await db.commit()
+
+    login_data = {"username": email, "password": raw_password}
+    response = await ac.post("/librarians/login", data=login_data)
+    tokens = response.json()
+    refresh_token = tokens["refresh_token"]
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    response = await ac.post(
+        "/librarians/logout", json={"refresh_token": refresh_token}, headers=headers
+    )
+    assert response.status_code == 204
+
+    response = await ac.post("/librarians/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 401
+
+
+async def test_logout_revokes_access_token(ac: AsyncClient, db: AsyncSession):
+    email = "test_logout_access@example.com"
+    raw_password = "securepassword"
+    librarian = Librarian(email=email, password=hash_password(raw_password))
+    db.add(librarian)
+    await db.commit()
+
+    login_data = {"username": email, "password": raw_password}
+    response = await ac.post("/librarians/login", data=login_data)
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = await ac.get("/users/", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    response = await ac.post("/librarians/logout", headers=headers)
+    assert response.status_code == 204
+
+    response = await ac.get("/users/", headers=headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+async def test_metrics_require_auth(ac: AsyncClient, db: AsyncSession):
+    response = await ac.get("/metrics/")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    email = "librarian@example.com"
+    password = "strongpassword"
+    db.add(Librarian(email=email, password=hash_password(password)))
+    await db.commit()
+
+    login_resp = await ac.post("/librarians/login", data={"username": email, "password": password})
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+    response = await ac.get("/metrics/", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert "# TYPE cache_requests_total counter" in response.text
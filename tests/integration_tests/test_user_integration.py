@@ -92,6 +92,10 @@ async def test_get_user_by_id_auth(ac: AsyncClient, db: AsyncSession):
     assert data["email"] == user.email
     assert data["name"] == user.name
 
+    etag = response.headers["ETag"]
+    response = await ac.get(f"/users/{user.id}", headers={**headers, "If-None-Match": f"W/{etag}"})
+    assert response.status_code == 304
+
 
 async def test_create_new_user_auth(ac: AsyncClient, db: AsyncSession):
     email = "librarian@example.com"
@@ -235,3 +239,42 @@ async def test_delete_existing_user_auth(ac: AsyncClient, db: AsyncSession):
     result = await db.execute(select(User).where(User.id == user.id))
     deleted_user = result.scalar_one_or_none()
     assert deleted_user is None
+
+
+async def test_lookup_users_by_ids_auth(ac: AsyncClient, db: AsyncSession, query_budget):
+    email = "librarian@example.com"
+    password = "strongpassword"
+    librarian = Librarian(email=email, password=hash_password(password))
+    db.add(librarian)
+    await db.commit()
+
+    login_data = {
+        "username": email,
+        "password": password,
+    }
+    login_resp = await ac.post("/librarians/login", data=login_data)
+    token = login_resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    alice = User(name="Alice", email="alice@example.com")
+    bob = User(name="Bob", email="bob@example.com")
+    db.add_all([alice, bob])
+    await db.commit()
+    missing_id = bob.id + 1000
+
+    with query_budget(2):
+        response = await ac.get(
+            "/users/", params={"ids": f"{bob.id},{alice.id},{missing_id}"}, headers=headers
+        )
+    assert response.status_code == 200
+    assert [user["name"] for user in response.json()] == ["Bob", "Alice"]
+    assert response.headers["X-Missing-Ids"] == str(missing_id)
+
+    with query_budget(2):
+        response = await ac.post(
+            "/users/lookup", json={"ids": [missing_id, alice.id]}, headers=headers
+        )
+    assert response.status_code == 200
+    body = response.json()
+    assert [user["email"] for user in body["items"]] == ["alice@example.com"]
+    assert body["missing"] == [missing_id]
@@ -0,0 +1,100 @@
+import pytest
+from app.models.book import Book
+from app.services.book_import_service import import_books, iter_records
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@pytest.fixture(autouse=True)
+async def clear_books_table(db: AsyncSession):
+    await db.execute(delete(Book))
+    await db.commit()
+
+    yield
+
+    await db.execute(delete(Book))
+    await db.commit()
+
+
+async def as_chunks(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def test_import_books_csv(db: AsyncSession):
+    data = (
+        "title,author,publication_year,isbn,copies_count\n"
+        'Dune,Frank Herbert,1965,111,3\n"War\nand Peace","Tolstoy, Leo",,222,\n'
+    ).encode()
+
+    report = await import_books(db, iter_records(as_chunks(data), "csv"))
+
+    assert report.received == 2
+    assert report.inserted == 2
+    assert report.errors == []
+
+    books = (await db.execute(select(Book).order_by(Book.isbn))).scalars().all()
+    assert [(book.title, book.author, book.copies_count) for book in books] == [
+        ("Dune", "Frank Herbert", 3),
+        ("War\nand Peace", "Tolstoy, Leo", 1),
+    ]
+
+
+async def test_import_books_ndjson_reports_invalid_rows(db: AsyncSession):
+    data = (
+        b'{"title": "Dune", "author": "Frank Herbert"}\n'
+        b'{"title": "No author"}\n'
+        b"not json\n"
+        b'{"title": "Solaris", "author": "Lem", "copies_count": -1}\n'
+    )
+
+    report = await import_books(db, iter_records(as_chunks(data), "ndjson"))
+
+    assert report.received == 4
+    assert report.inserted == 1
+    assert report.failed == 3
+    assert [error.row for error in report.errors] == [2, 3, 4]
+    assert report.errors[0].detail.startswith("author:")
+
+
+async def test_import_books_skips_blank_lines(db: AsyncSession):
+    ndjson = b'\n{"title": "Dune", "author": "Frank Herbert"}\n  \n\r\n{"title": "No author"}\n\n'
+    report = await import_books(db, iter_records(as_chunks(ndjson), "ndjson"))
+
+    assert report.received == 2
+    assert report.inserted == 1
+    assert [error.row for error in report.errors] == [2]
+
+    csv_data = (
+        '\ntitle,author,isbn\n\nSolaris,Lem,111\r\n\r\n"Blank\n\nInside",Author,222\n\n'
+    ).encode()
+    report = await import_books(db, iter_records(as_chunks(csv_data), "csv"))
+
+    assert report.received == 2
+    assert report.inserted == 2
+    assert report.errors == []
+    titles = await db.scalars(select(Book.title).where(Book.isbn.is_not(None)).order_by(Book.isbn))
+    assert titles.all() == ["Solaris", "Blank\n\nInside"]
+
+
+async def test_import_books_isbn_conflicts(db: AsyncSession):
+    db.add(Book(title="Existing", author="Author", isbn="111"))
+    await db.commit()
+
+    data = (
+        b'{"title": "Conflict", "author": "A", "isbn": "111"}\n'
+        b'{"title": "First", "author": "B", "isbn": "222"}\n'
+        b'{"title": "Duplicate", "author": "C", "isbn": "222"}\n'
+        b'{"title": "No ISBN", "author": "D"}\n'
+    )
+
+    report = await import_books(db, iter_records(as_chunks(data), "ndjson"))
+
+    assert report.inserted == 2
+    assert [(error.row, error.detail) for error in report.errors] == [
+        (1, "Book with ISBN 111 already exists"),
+        (3, "Book with ISBN 222 already exists"),
+    ]
+
+    titles = (await db.execute(select(Book.title).order_by(Book.id))).scalars().all()
+    assert titles == ["Existing", "First", "No ISBN"]
@@ -1,17 +1,26 @@
+import asyncio
+
 import pytest
+from app.core.pagination import encode_cursor, next_cursor
 from app.models.book import Book
-from app.schemas.book import BookIn, BookPatch
+from app.models.book_copy_shard import BookCopyShard
+from app.schemas.book import BookIn, BookOut, BookPatch
 from app.services.book_service import (
+    BOOK_SORT_COLUMNS,
+    book_fields,
     create_book,
     delete_book,
     get_book_by_id,
     list_books,
+    search_books,
     update_book,
 )
 from fastapi import HTTPException
-from sqlalchemy import delete
+from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from tests.conftest import async_session_maker_null_pool
+
 
 @pytest.fixture(autouse=True)
 async def clear_books_table(db: AsyncSession):
@@ -64,6 +73,125 @@ async def test_list_books(db: AsyncSession):
     assert "Book 2" in titles
 
 
+async def test_list_books_rows_serialize_like_book_out(db: AsyncSession):
+    book = Book(title="Rows", author="Author", isbn="111", description="Not selected")
+    db.add(book)
+    await db.commit()
+    await db.refresh(book)
+
+    rows = await list_books(db)
+
+    assert book_fields.all.list_serializer.dump(rows, trusted=True) == (
+        BookOut.model_validate(book).model_dump_json(by_alias=True).join(["[", "]"]).encode()
+    )
+
+
+async def test_list_books_keyset_pagination(db: AsyncSession):
+    db.add_all([Book(title=f"Book {i}", author="Author") for i in range(5)])
+    await db.commit()
+
+    first_page = await list_books(db, limit=2)
+    cursor = next_cursor(first_page, BOOK_SORT_COLUMNS["id"], sort="id", limit=2)
+    second_page = await list_books(db, limit=2, after=cursor)
+    cursor = next_cursor(second_page, BOOK_SORT_COLUMNS["id"], sort="id", limit=2)
+    last_page = await list_books(db, limit=2, after=cursor)
+
+    ids = [book.id for book in first_page + second_page + last_page]
+    assert len(last_page) == 1
+    assert ids == sorted(ids)
+    assert len(set(ids)) == 5
+    assert next_cursor(last_page, BOOK_SORT_COLUMNS["id"], sort="id", limit=2) is None
+
+
+async def test_list_books_sorted_by_title(db: AsyncSession):
+    db.add_all(
+        [
+            Book(title="Charlie", author="Author"),
+            Book(title="Alpha", author="Author"),
+            Book(title="Bravo", author="Author"),
+        ]
+    )
+    await db.commit()
+
+    first_page = await list_books(db, limit=2, sort="title")
+    cursor = next_cursor(first_page, BOOK_SORT_COLUMNS["title"], sort="title", limit=2)
+    second_page = await list_books(db, limit=2, after=cursor, sort="title")
+
+    assert [book.title for book in first_page] == ["Alpha", "Bravo"]
+    assert [book.title for book in second_page] == ["Charlie"]
+
+
+async def test_list_books_invalid_cursor(db: AsyncSession):
+    cursor = next_cursor([Book(id=1, title="A")], BOOK_SORT_COLUMNS["id"], sort="id", limit=1)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await list_books(db, after=cursor, sort="title")
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Invalid cursor"
+
+
+@pytest.mark.parametrize(
+    "sort, values",
+    [
+        ("id", ["abc"]),
+        ("id", [{"x": 1}]),
+        ("id", [True]),
+        ("id", [2**40]),
+        ("title", [1, 1]),
+        ("title", ["A", "1"]),
+        ("title", ["A\x00", 1]),
+    ],
+)
+async def test_list_books_cursor_with_wrong_value_types(db: AsyncSession, sort, values):
+    with pytest.raises(HTTPException) as exc_info:
+        await list_books(db, after=encode_cursor(sort, values), sort=sort)
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Invalid cursor"
+
+
+async def test_search_books_full_text_and_ranking(db: AsyncSession):
+    db.add_all(
+        [
+            Book(title="Dune", author="Frank Herbert", description="Desert planet saga"),
+            Book(title="Planet of the Apes", author="Pierre Boulle"),
+            Book(title="Solaris", author="Stanislaw Lem"),
+        ]
+    )
+    await db.commit()
+
+    books = await search_books(db, "planet")
+
+    assert [book.title for book in books] == ["Planet of the Apes", "Dune"]
+
+
+async def test_search_books_typo_tolerant_author(db: AsyncSession):
+    db.add_all(
+        [
+            Book(title="The Hobbit", author="J.R.R. Tolkien"),
+            Book(title="Solaris", author="Stanislaw Lem"),
+        ]
+    )
+    await db.commit()
+
+    books = await search_books(db, "Tolkin")
+
+    assert [book.title for book in books] == ["The Hobbit"]
+
+
+async def test_search_books_paginated(db: AsyncSession):
+    db.add_all([Book(title=f"Chronicle {i}", author="Author") for i in range(3)])
+    await db.commit()
+
+    first_page = await search_books(db, "chronicle", limit=2)
+    second_page = await search_books(db, "chronicle", limit=2, offset=2)
+
+    ids = [book.id for book in first_page + second_page]
+    assert len(first_page) == 2
+    assert len(set(ids)) == 3
+
+
 async def test_create_book_success(db: AsyncSession):
     book_data = BookIn(title="Clean Code", author="Robert C. Martin", isbn="9780132350884")
 
@@ -86,6 +214,21 @@ async def test_create_book_duplicate_isbn(db: AsyncSession):
     assert exc_info.value.detail == "Book with this ISBN already exists"
 
 
+async def test_create_book_concurrent_duplicate_isbn():
+    book_data = BookIn(title="Clean Code", author="Robert C. Martin", isbn="9780132350884")
+
+    async def attempt():
+        async with async_session_maker_null_pool() as session:
+            return await create_book(session, book_data)
+
+    results = await asyncio.gather(*(attempt() for _ in range(5)), return_exceptions=True)
+
+    errors = [result for result in results if isinstance(result, Exception)]
+    assert len(errors) == 4
+    assert all(isinstance(error, HTTPException) for error in errors)
+    assert {error.status_code for error in errors} == {409}
+
+
 async def test_update_book_success(db: AsyncSession):
     original = Book(title="Old Title", author="Old Author")
     db.add(original)
@@ -146,6 +289,37 @@ async def test_update_book_isbn_conflict(db: AsyncSession):
     assert exc_info.value.detail == "Book with this ISBN already exists"
 
 
+async def test_update_book_keeps_own_isbn(db: AsyncSession):
+    original = Book(title="Old Title", author="Old Author", isbn="111")
+    db.add(original)
+    await db.commit()
+    await db.refresh(original)
+
+    new_data = BookIn(title="New Title", author="Old Author", isbn="111")
+    updated = await update_book(db, book_id=original.id, book_data=new_data)
+
+    assert updated.title == "New Title"
+    assert updated.isbn == "111"
+    assert updated.version == 2
+
+
+async def test_update_book_reshards_copies(db: AsyncSession):
+    book = await create_book(
+        db, BookIn(title="Bestseller", author="Author", copies_count=6, copy_shards=3)
+    )
+    assert book.copies_count == 0
+    assert book.available_copies == 6
+
+    updated = await update_book(db, book.id, BookPatch(copies_count=7))
+    assert updated.available_copies == 7
+    assert BookOut.model_validate(updated).copies_count == 7
+
+    updated = await update_book(db, book.id, BookPatch(copy_shards=1))
+    assert updated.copies_count == 7
+    assert updated.available_copies == 7
+    assert await db.scalar(select(func.count()).select_from(BookCopyShard)) == 0
+
+
 async def test_delete_book_success(db: AsyncSession):
     book = Book(title="To Delete", author="Someone", isbn="000")
     db.add(book)
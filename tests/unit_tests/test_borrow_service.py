@@ -1,15 +1,27 @@
+import asyncio
 from datetime import datetime, timezone
 
 import pytest
 from app.models.book import Book
+from app.models.book_copy_shard import BookCopyShard
 from app.models.borrowed_book import BorrowedBook
 from app.models.user import User
+from app.schemas.book import BookIn
 from app.schemas.borrow import BorrowRequest
-from app.services.borrow_service import borrow_book, get_active_borrowed_books, return_book
+from app.services.book_service import create_book
+from app.services.borrow_service import (
+    borrow_book,
+    borrow_books,
+    get_active_borrowed_books,
+    return_book,
+    return_books,
+)
 from fastapi import HTTPException
 from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from tests.conftest import async_session_maker_null_pool
+
 
 @pytest.fixture(autouse=True)
 async def clear_tables(db: AsyncSession):
@@ -42,6 +54,26 @@ async def test_borrow_book_success(db: AsyncSession):
     assert updated_book.copies_count == 1
 
 
+async def test_borrow_book_last_copy_concurrently(db: AsyncSession):
+    async with db.begin():
+        users = [User(name=f"Reader {i}", email=f"reader{i}@example.com") for i in range(2)]
+        book = Book(title="Test Book", author="Author", copies_count=1)
+        db.add_all([*users, book])
+
+    async def attempt(reader_id: int):
+        async with async_session_maker_null_pool() as session:
+            return await borrow_book(session, BorrowRequest(book_id=book.id, reader_id=reader_id))
+
+    results = await asyncio.gather(*(attempt(user.id) for user in users), return_exceptions=True)
+
+    errors = [result for result in results if isinstance(result, HTTPException)]
+    assert len(errors) == 1
+    assert errors[0].detail == "No available copies"
+
+    await db.refresh(book)
+    assert book.copies_count == 0
+
+
 async def test_borrow_book_book_not_found(db: AsyncSession):
     async with db.begin():
         user = User(name="John", email="john@example.com")
@@ -86,7 +118,7 @@ async def test_borrow_book_no_copies(db: AsyncSession):
 
 
 async def test_borrow_book_max_borrows(db: AsyncSession):
-    user = User(name="John", email="john@example.com")
+    user = User(name="John", email="john@example.com", active_borrows=3)
     book = Book(title="Test Book", author="Author", copies_count=5)
     db.add_all([user, book])
     await db.commit()
@@ -112,7 +144,7 @@ async def test_borrow_book_max_borrows(db: AsyncSession):
 
 async def test_return_book_success(db: AsyncSession):
     async with db.begin():
-        user = User(name="John", email="john@example.com")
+        user = User(name="John", email="john@example.com", active_borrows=1)
         book = Book(title="Book 1", author="Author", copies_count=1)
         db.add_all([user, book])
 
@@ -133,6 +165,45 @@ async def test_return_book_success(db: AsyncSession):
     assert updated_borrowed.return_date is not None
 
 
+async def test_borrow_and_return_maintain_active_borrows(db: AsyncSession):
+    async with db.begin():
+        user = User(name="John", email="john@example.com")
+        book = Book(title="Book 1", author="Author", copies_count=1)
+        db.add_all([user, book])
+
+    data = BorrowRequest(book_id=book.id, reader_id=user.id)
+
+    await borrow_book(db, data)
+    await db.refresh(user)
+    assert user.active_borrows == 1
+    await db.commit()
+
+    await return_book(db, data)
+    await db.refresh(user)
+    assert user.active_borrows == 0
+
+
+async def test_return_book_with_two_copies_borrowed(db: AsyncSession):
+    async with db.begin():
+        user = User(name="John", email="john@example.com")
+        book = Book(title="Book 1", author="Author", copies_count=2)
+        db.add_all([user, book])
+
+    data = BorrowRequest(book_id=book.id, reader_id=user.id)
+    first = await borrow_book(db, data)
+    second = await borrow_book(db, data)
+
+    await return_book(db, data)
+    open_ids = select(BorrowedBook.id).where(BorrowedBook.return_date.is_(None))
+    assert (await db.scalars(open_ids)).all() == [second.id]
+    await db.commit()
+
+    await return_book(db, data)
+    assert (await db.scalars(open_ids)).all() == []
+    assert await db.scalar(select(Book.copies_count).where(Book.id == book.id)) == 2
+    assert first.id < second.id
+
+
 async def test_return_book_not_found_book(db: AsyncSession):
     async with db.begin():
         user = User(name="John", email="john@example.com")
@@ -210,3 +281,152 @@ async def test_get_active_borrowed_books(db: AsyncSession):
     assert len(active_books) == 1
     assert active_books[0].id == book1.id
     assert active_books[0].title == "Active Borrowed Book"
+
+
+async def test_borrow_books_partial_reports_each_item(db: AsyncSession):
+    async with db.begin():
+        user = User(name="John", email="john@example.com", active_borrows=1)
+        books = [Book(title=f"Book {i}", author="Author", copies_count=1) for i in range(3)]
+        db.add_all([user, *books])
+
+    items = [BorrowRequest(book_id=book.id, reader_id=user.id) for book in books]
+    items.insert(1, BorrowRequest(book_id=books[0].id, reader_id=user.id))
+    results = await borrow_books(db, items, mode="partial")
+
+    assert [result.status_code for result in results] == [201, 400, 201, 400]
+    assert results[1].detail == "No available copies"
+    assert results[3].detail == "Reader has already borrowed 3 books"
+    assert results[0].borrowed.book_id == books[0].id
+    assert results[2].borrowed.book_id == books[1].id
+
+    await db.refresh(user)
+    assert user.active_borrows == 3
+    copies = (await db.execute(select(Book.copies_count).order_by(Book.id))).scalars().all()
+    assert copies == [0, 0, 1]
+
+
+async def test_borrow_books_atomic_rolls_back_on_failure(db: AsyncSession):
+    async with db.begin():
+        user = User(name="John", email="john@example.com")
+        book = Book(title="Test Book", author="Author", copies_count=1)
+        db.add_all([user, book])
+
+    reader_id = user.id
+    items = [
+        BorrowRequest(book_id=book.id, reader_id=reader_id),
+        BorrowRequest(book_id=9999, reader_id=reader_id),
+    ]
+    with pytest.raises(HTTPException) as exc_info:
+        await borrow_books(db, items)
+
+    assert exc_info.value.status_code == 404
+    assert exc_info.value.detail == [
+        {"index": 1, "book_id": 9999, "reader_id": reader_id, "detail": "Book not found"}
+    ]
+
+    await db.refresh(book)
+    assert book.copies_count == 1
+    assert (await db.execute(select(BorrowedBook))).scalars().all() == []
+
+
+async def test_return_books_batch(db: AsyncSession):
+    async with db.begin():
+        user = User(name="John", email="john@example.com", active_borrows=2)
+        book = Book(title="Test Book", author="Author", copies_count=0)
+        db.add_all([user, book])
+    async with db.begin():
+        db.add_all([BorrowedBook(book_id=book.id, reader_id=user.id) for _ in range(2)])
+
+    item = BorrowRequest(book_id=book.id, reader_id=user.id)
+    results = await return_books(db, [item, item, item], mode="partial")
+
+    assert [result.status_code for result in results] == [200, 200, 404]
+    assert all(result.borrowed.return_date is not None for result in results[:2])
+
+    await db.refresh(user)
+    await db.refresh(book)
+    assert user.active_borrows == 0
+    assert book.copies_count == 2
+    assert book.version == 2
+
+
+async def test_sharded_book_borrow_concurrently_and_return(db: AsyncSession):
+    book = await create_book(
+        db, BookIn(title="Bestseller", author="Author", copies_count=5, copy_shards=4)
+    )
+    async with db.begin():
+        users = [User(name=f"Reader {i}", email=f"reader{i}@example.com") for i in range(8)]
+        db.add_all(users)
+
+    shard_counts = (
+        (
+            await db.execute(
+                select(BookCopyShard.copies_count)
+                .where(BookCopyShard.book_id == book.id)
+                .order_by(BookCopyShard.shard)
+            )
+        )
+        .scalars()
+        .all()
+    )
+    assert shard_counts == [2, 1, 1, 1]
+
+    async def attempt(reader_id: int):
+        async with async_session_maker_null_pool() as session:
+            return await borrow_book(session, BorrowRequest(book_id=book.id, reader_id=reader_id))
+
+    results = await asyncio.gather(*(attempt(user.id) for user in users), return_exceptions=True)
+
+    borrowed = [result for result in results if isinstance(result, BorrowedBook)]
+    errors = [result for result in results if isinstance(result, HTTPException)]
+    assert len(borrowed) == 5
+    assert [error.detail for error in errors] == ["No available copies"] * 3
+
+    available = select(Book.available_copies).where(Book.id == book.id)
+    assert await db.scalar(available) == 0
+    await db.commit()
+
+    await return_book(db, BorrowRequest(book_id=book.id, reader_id=borrowed[0].reader_id))
+    results = await return_books(
+        db, [BorrowRequest(book_id=book.id, reader_id=item.reader_id) for item in borrowed[1:3]]
+    )
+    assert [result.status_code for result in results] == [200, 200]
+    assert await db.scalar(available) == 3
+    await db.commit()
+
+    results = await borrow_books(db, [BorrowRequest(book_id=book.id, reader_id=users[0].id)])
+    assert results[0].status_code == 201
+    assert await db.scalar(available) == 2
+    assert await db.scalar(select(Book.copies_count).where(Book.id == book.id)) == 0
+
+
+async def test_sharded_book_single_borrow_and_batch_return_concurrently(db: AsyncSession):
+    book = await create_book(
+        db, BookIn(title="Bestseller", author="Author", copies_count=40, copy_shards=4)
+    )
+    async with db.begin():
+        returning = [User(name=f"Return {i}", email=f"return{i}@example.com") for i in range(8)]
+        borrowing = [User(name=f"Borrow {i}", email=f"borrow{i}@example.com") for i in range(8)]
+        db.add_all([*returning, *borrowing])
+    for user in returning:
+        for _ in range(3):
+            await borrow_book(db, BorrowRequest(book_id=book.id, reader_id=user.id))
+
+    async def borrow(reader_id: int):
+        async with async_session_maker_null_pool() as session:
+            return await borrow_book(session, BorrowRequest(book_id=book.id, reader_id=reader_id))
+
+    async def return_batch(reader_id: int):
+        async with async_session_maker_null_pool() as session:
+            items = [BorrowRequest(book_id=book.id, reader_id=reader_id)] * 3
+            return await return_books(session, items)
+
+    results = await asyncio.gather(
+        *(borrow(user.id) for user in borrowing),
+        *(return_batch(user.id) for user in returning),
+        return_exceptions=True,
+    )
+
+    assert [result for result in results if isinstance(result, Exception)] == []
+    available = select(Book.available_copies).where(Book.id == book.id)
+    assert await db.scalar(available) == 40 - len(borrowing)
@@ -0,0 +1,211 @@
+import asyncio
+
+import pytest
+from app.core.cache import LRUCache, RedisBackend, cache, cache_requests
+from app.models.book import Book
+from app.schemas.book import BookIn
+from app.services import book_service
+from app.services.book_service import book_cache_key, get_book_by_id, read_book, update_book
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tests.conftest import async_session_maker_null_pool
+
+
+@pytest.fixture(autouse=True)
+async def clear_tables(db: AsyncSession):
+    await db.execute(delete(Book))
+    await db.commit()
+
+    yield
+
+    await db.execute(delete(Book))
+    await db.commit()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_expires_entries_after_ttl():
+    clock = FakeClock()
+    lru = LRUCache(max_entries=10, clock=clock)
+    lru.set("a", 1, ttl=5)
+
+    clock.now = 4.9
+    assert lru.get("a") == 1
+    clock.now = 5
+    assert lru.get("a") is None
+    assert len(lru) == 0
+
+
+def test_lru_evicts_least_recently_used_within_limits():
+    lru = LRUCache(max_entries=2, max_bytes=10)
+    lru.set("a", 1, size=4)
+    lru.set("b", 2, size=4)
+    lru.get("a")
+    lru.set("c", 3, size=4)
+
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+    assert lru.size == 8
+
+    lru.set("d", 4, size=11)
+    assert lru.get("d") is None
+
+
+async def test_read_book_is_cached_and_invalidated_on_update(db: AsyncSession):
+    book = Book(title="Cached", author="Author", copies_count=1)
+    db.add(book)
+    await db.commit()
+
+    hits = cache_requests.get(namespace="book", result="hit")
+    first = await read_book(db, book.id)
+
+    await db.execute(update(Book).where(Book.id == book.id).values(title="Changed behind cache"))
+    await db.commit()
+    assert (await read_book(db, book.id)).title == first.title
+    assert cache_requests.get(namespace="book", result="hit") == hits + 1
+
+    await update_book(db, book.id, BookIn(title="Updated", author="Author", copies_count=1))
+    assert await cache.get(book_cache_key(book.id)) is None
+    assert (await read_book(db, book.id)).title == "Updated"
+
+
+async def test_fill_does_not_restore_a_value_read_before_invalidation(
+    db: AsyncSession, monkeypatch
+):
+    book = Book(title="Before", author="Author", copies_count=1)
+    db.add(book)
+    await db.commit()
+
+    async def read_then_concurrent_update(session, book_id):
+        stale = await get_book_by_id(session, book_id)
+        async with async_session_maker_null_pool() as other:
+            await update_book(other, book_id, BookIn(title="After", author="Author"))
+        return stale
+
+    monkeypatch.setattr(book_service, "get_book_by_id", read_then_concurrent_update)
+    assert (await read_book(db, book.id)).title == "Before"
+    monkeypatch.undo()
+
+    assert await cache.get(book_cache_key(book.id)) is None
+    async with async_session_maker_null_pool() as session:
+        assert (await read_book(session, book.id)).title == "After"
+
+
+async def fake_redis_server():
+    """A tiny in-memory server speaking the subset of RESP used by ``RedisBackend``."""
+    store: dict[bytes, bytes] = {}
+
+    async def read_command(reader: asyncio.StreamReader) -> list[bytes]:
+        count = int((await reader.readline())[1:-2])
+        args = []
+        for _ in range(count):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        while not reader.at_eof():
+            try:
+                command, *args = await read_command(reader)
+            except (ValueError, asyncio.IncompleteReadError):
+                break
+            command = command.upper()
+            if command == b"GET":
+                value = store.get(args[0])
+                reply = b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+                if args[0].endswith(b":slow"):
+                    # Send part of the reply, then stall until the client hangs up.
+                    writer.write(reply[:4])
+                    await writer.drain()
+                    await reader.read()
+            elif command == b"SET":
+                if b"NX" in args[2:] and args[0] in store:
+                    reply = b"$-1\r\n"
+                else:
+                    store[args[0]] = args[1]
+                    reply = b"+OK\r\n"
+            elif command == b"DEL":
+                removed = sum(store.pop(key, None) is not None for key in args)
+                reply = b":%d\r\n" % removed
+            elif command == b"SCAN":
+                prefix = args[2].rstrip(b"*")
+                keys = [key for key in store if key.startswith(prefix)]
+                reply = b"*2\r\n$1\r\n0\r\n*%d\r\n" % len(keys) + b"".join(
+                    b"$%d\r\n%s\r\n" % (len(key), key) for key in keys
+                )
+            else:
+                reply = b"-ERR unknown command\r\n"
+            writer.write(reply)
+            await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, store
+
+
+async def test_redis_backend_round_trip():
+    server, store = await fake_redis_server()
+    port = server.sockets[0].getsockname()[1]
+    backend = RedisBackend(f"redis://127.0.0.1:{port}/0")
+    try:
+        assert await backend.get("book:1") is None
+        await backend.set("book:1", b"payload", ttl=60)
+        await backend.set("book:2", b"other", ttl=60)
+        assert store[b"library:book:1"] == b"payload"
+        assert await backend.get("book:1") == b"payload"
+        await backend.add("book:1", b"other", ttl=60)
+        assert await backend.get("book:1") == b"payload"
+
+        await backend.delete("book:1")
+        assert await backend.get("book:1") is None
+
+        await backend.clear()
+        assert store == {}
+    finally:
+        await backend.close()
+        server.close()
+        await server.wait_closed()
+
+
+async def test_redis_backend_treats_unavailable_server_as_miss():
+    server, _ = await fake_redis_server()
+    port = server.sockets[0].getsockname()[1]
+    server.close()
+    await server.wait_closed()
+
+    backend = RedisBackend(f"redis://127.0.0.1:{port}/0")
+    await backend.set("book:1", b"payload", ttl=60)
+    assert await backend.get("book:1") is None
+
+
+async def test_redis_backend_drops_connection_after_interrupted_command():
+    server, store = await fake_redis_server()
+    port = server.sockets[0].getsockname()[1]
+    store[b"library:book:slow"] = b'{"id":1}'
+    store[b"library:book:2"] = b'{"id":2}'
+    backend = RedisBackend(f"redis://127.0.0.1:{port}/0", timeout=0.1)
+    try:
+        task = asyncio.create_task(backend.get("book:slow"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert await backend.get("book:2") == b'{"id":2}'
+
+        assert await backend.get("book:slow") is None
+        assert await backend.get("book:2") == b'{"id":2}'
+
+        assert await backend.execute("PING") is None
+        assert await backend.get("book:2") == b'{"id":2}'
+    finally:
+        await backend.close()
+        server.close()
+        await server.wait_closed()
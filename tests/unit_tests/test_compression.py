@@ -0,0 +1,176 @@
+import gzip
+import zlib
+
+import pytest
+from app.core import compression
+from app.core.compression import (
+    BrotliEncoder,
+    CompressionMiddleware,
+    GzipEncoder,
+    ZstdEncoder,
+    compressed_responses,
+    is_compressible,
+    negotiate,
+)
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+LARGE = {"items": [{"id": i, "title": f"Book {i}"} for i in range(200)]}
+
+
+async def large(request):
+    return JSONResponse(LARGE, headers={"ETag": '"abc"'})
+
+
+async def small(request):
+    return JSONResponse({"id": 1})
+
+
+async def image(request):
+    return Response(b"\x89PNG" * 1000, media_type="image/png")
+
+
+async def stream(request):
+    async def chunks():
+        for i in range(100):
+            yield f"{i},Book {i}\n".encode()
+
+    return StreamingResponse(chunks(), media_type="text/csv")
+
+
+def client() -> AsyncClient:
+    app = Starlette(
+        routes=[
+            Route("/large", large),
+            Route("/small", small),
+            Route("/image", image),
+            Route("/stream", stream),
+        ]
+    )
+    middleware = CompressionMiddleware(
+        app, encoders={"gzip": lambda: GzipEncoder(6)}, minimum_size=500
+    )
+    return AsyncClient(transport=ASGITransport(app=middleware), base_url="http://test")
+
+
+def test_negotiate_prefers_highest_weight_then_server_order():
+    supported = ["zstd", "br", "gzip"]
+    assert negotiate("gzip, br", supported) == "br"
+    assert negotiate("gzip;q=1.0, br;q=0.5", supported) == "gzip"
+    assert negotiate("br;q=0, *", supported) == "zstd"
+    assert negotiate("identity", supported) is None
+    assert negotiate("", supported) is None
+
+
+def test_is_compressible_checks_media_type():
+    assert is_compressible("application/json")
+    assert is_compressible("text/csv; charset=utf-8")
+    assert is_compressible("application/problem+json")
+    assert not is_compressible("image/png")
+    assert not is_compressible("")
+
+
+async def test_large_json_is_gzipped_and_etag_weakened():
+    async with client() as ac:
+        response = await ac.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers["ETag"] == 'W/"abc"'
+    assert int(response.headers["Content-Length"]) < len(response.content)
+    assert response.json() == LARGE
+
+
+async def test_small_and_binary_responses_are_left_alone():
+    identity = compressed_responses.get(encoding="identity")
+    async with client() as ac:
+        small_response = await ac.get("/small", headers={"Accept-Encoding": "gzip"})
+        image_response = await ac.get("/image", headers={"Accept-Encoding": "gzip"})
+        plain_response = await ac.get("/large", headers={"Accept-Encoding": "identity"})
+
+    assert "Content-Encoding" not in small_response.headers
+    assert small_response.json() == {"id": 1}
+    assert compressed_responses.get(encoding="identity") == identity + 1
+    assert "Content-Encoding" not in image_response.headers
+    assert "Content-Encoding" not in plain_response.headers
+    assert plain_response.headers["ETag"] == '"abc"'
+
+
+async def test_streaming_body_is_compressed_incrementally():
+    async with client() as ac:
+        async with ac.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    expected = "".join(f"{i},Book {i}\n" for i in range(100))
+    assert gzip.decompress(raw).decode() == expected
+
+
+def encoder_and_decompressor(encoding: str):
+    if encoding == "br":
+        brotli = pytest.importorskip("brotli")
+        return BrotliEncoder(4), brotli.Decompressor().process
+    if encoding == "zstd":
+        zstandard = pytest.importorskip("zstandard")
+        return ZstdEncoder(3), zstandard.ZstdDecompressor().decompressobj().decompress
+    return GzipEncoder(6), zlib.decompressobj(16 + zlib.MAX_WBITS).decompress
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+def test_encoder_flush_makes_each_chunk_decodable(encoding):
+    encoder, decompress = encoder_and_decompressor(encoding)
+    chunks = [f"{i},Book {i}\n".encode() * 10 for i in range(5)]
+
+    decoded = []
+    for chunk in chunks:
+        decoded.append(decompress(encoder.compress(chunk) + encoder.flush()))
+    decoded.append(decompress(encoder.finish()))
+
+    assert decoded[:-1] == chunks
+    assert decoded[-1] == b""
+
+
+async def test_streaming_chunks_are_flushed_as_they_are_produced():
+    async def app(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/x-ndjson")],
+            }
+        )
+        for i in range(3):
+            body = b'{"id":%d}\n' % i
+            await send({"type": "http.response.body", "body": body, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    async def receive():
+        return {"type": "http.request"}
+
+    middleware = CompressionMiddleware(app, encoders={"gzip": lambda: GzipEncoder(6)})
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+    await middleware(scope, receive, send)
+
+    decompress = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress
+    bodies = [decompress(message["body"]) for message in messages[1:]]
+    assert bodies == [b'{"id":0}\n', b'{"id":1}\n', b'{"id":2}\n', b""]
+
+
+def test_available_encoders_logs_missing_codecs(monkeypatch, caplog):
+    monkeypatch.setattr(compression, "brotli", None)
+
+    encoders = compression.available_encoders(
+        ["zstd", "br", "gzip"], gzip_level=6, brotli_quality=4, zstd_level=3
+    )
+
+    assert "br" not in encoders
+    assert "gzip" in encoders
+    assert "br compression is disabled: brotli is not installed" in caplog.text
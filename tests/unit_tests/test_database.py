@@ -0,0 +1,105 @@
+import pytest
+from app.core.config import settings
+from app.db.pool import (
+    InstrumentedPool,
+    _pool_usage,
+    checkout_timeouts,
+    checkout_wait,
+    connection_lifetime,
+    instrument_pool,
+)
+from app.db.session import _is_plain_read, standalone_reads
+from app.db.slow_queries import SlowQueryLog
+from app.models.book import Book
+from sqlalchemy import delete, exc, func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+
+@pytest.fixture(autouse=True)
+async def clear_tables(db: AsyncSession):
+    await db.execute(delete(Book))
+    await db.commit()
+
+    yield
+
+    await db.execute(delete(Book))
+    await db.commit()
+
+
+async def test_instrumented_pool_reports_usage_waits_and_timeouts():
+    engine = create_async_engine(
+        settings.TEST_POSTGRES_URL_ASYNC,
+        poolclass=InstrumentedPool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+        pool_logging_name="test",
+    )
+    instrument_pool("test", engine.pool)
+    try:
+        async with engine.connect() as connection:
+            assert await connection.scalar(text("SELECT 1")) == 1
+            assert _pool_usage()[("test", "checked_out")] == 1
+
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+            assert checkout_timeouts.get(pool="test") == 1
+
+        assert _pool_usage()[("test", "checked_out")] == 0
+        assert _pool_usage()[("test", "idle")] == 1
+        assert checkout_wait.counts[("test",)][-1] == 0
+        assert sum(checkout_wait.counts[("test",)]) == 2
+    finally:
+        await engine.dispose()
+
+    assert sum(connection_lifetime.counts[("test",)]) == 1
+
+
+async def test_standalone_reads_release_the_connection(db: AsyncSession):
+    reads = standalone_reads.get()
+    assert await db.scalar(select(func.count()).select_from(Book)) == 0
+    assert not db.in_transaction()
+    assert standalone_reads.get() == reads + 1
+
+    await db.execute(select(Book).with_for_update())
+    assert db.in_transaction()
+    await db.rollback()
+
+    db.add(Book(title="Pending", author="Author"))
+    assert await db.scalar(select(func.count()).select_from(Book)) == 1
+    assert db.in_transaction()
+    await db.rollback()
+
+    assert await db.scalar(select(func.count()).select_from(Book)) == 0
+    assert standalone_reads.get() == reads + 2
+
+
+def test_reads_with_data_modifying_ctes_are_not_standalone():
+    updated = update(Book).values(version=Book.version + 1).returning(Book.id).cte("updated")
+    assert _is_plain_read(select(Book.id))
+    assert not _is_plain_read(select(updated.c.id))
+
+
+async def test_slow_query_log_explains_sampled_statements(tmp_path, caplog, db: AsyncSession):
+    db.add(Book(title="Slow", author="Author"))
+    await db.commit()
+
+    engine = create_async_engine(settings.TEST_POSTGRES_URL_ASYNC)
+    explain_file = tmp_path / "slow.log"
+    SlowQueryLog(threshold=0, sample_rate=1, explain_file=explain_file).install(engine.sync_engine)
+    try:
+        async with engine.begin() as connection:
+            title = await connection.scalar(select(Book.title).where(Book.author == "Author"))
+            await connection.execute(update(Book).values(version=Book.version + 1))
+            assert await connection.scalar(select(Book.version)) == 2
+    finally:
+        await engine.dispose()
+
+    assert title == "Slow"
+    messages = [r.getMessage() for r in caplog.records if r.name == "app.db.slow_queries"]
+    assert "parameters: ['str[6]']" in messages[0]
+    assert "Author" not in messages[0]
+    plans = explain_file.read_text()
+    assert plans.count("Execution Time") == 2
+    assert "Update on books" in plans
@@ -0,0 +1,67 @@
+import orjson
+import pytest
+from app.models.book import Book
+from app.models.borrowed_book import BorrowedBook
+from app.models.user import User
+from app.services.export_service import export_books, export_borrow_history, export_users
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tests.conftest import async_session_maker_null_pool
+
+
+@pytest.fixture(autouse=True)
+async def clear_tables(db: AsyncSession):
+    await db.execute(delete(BorrowedBook))
+    await db.execute(delete(User))
+    await db.execute(delete(Book))
+    await db.commit()
+
+    yield
+
+    await db.execute(delete(BorrowedBook))
+    await db.execute(delete(User))
+    await db.execute(delete(Book))
+    await db.commit()
+
+
+async def collect(chunks) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+
+async def test_export_books_ndjson(db: AsyncSession):
+    db.add_all([Book(title="Book 1", author="Author 1"), Book(title="Book 2", author="Author 2")])
+    await db.commit()
+
+    body = await collect(export_books(async_session_maker_null_pool, "ndjson"))
+
+    rows = [orjson.loads(line) for line in body.splitlines()]
+    assert [row["title"] for row in rows] == ["Book 1", "Book 2"]
+    assert set(rows[0]) == {"id", "title", "author", "publication_year", "isbn", "copies_count"}
+
+
+async def test_export_users_csv(db: AsyncSession):
+    db.add(User(name="Reader, Jr.", email="reader@example.com"))
+    await db.commit()
+
+    body = await collect(export_users(async_session_maker_null_pool, "csv"))
+
+    lines = body.decode().splitlines()
+    assert lines[0] == "id,name,email"
+    assert lines[1].endswith(',"Reader, Jr.",reader@example.com')
+
+
+async def test_export_borrow_history_ndjson(db: AsyncSession):
+    user = User(name="Reader", email="reader@example.com")
+    book = Book(title="Book", author="Author")
+    db.add_all([user, book])
+    await db.commit()
+    db.add(BorrowedBook(book_id=book.id, reader_id=user.id))
+    await db.commit()
+
+    body = await collect(export_borrow_history(async_session_maker_null_pool, "ndjson"))
+
+    rows = [orjson.loads(line) for line in body.splitlines()]
+    assert len(rows) == 1
+    assert rows[0]["book_id"] == book.id
+    assert rows[0]["return_date"] is None
@@ -1,10 +1,34 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
 import pytest
-from app.core.security import hash_password, verify_password
+from app.core.bloom import BloomFilter
+from app.core.config import settings
+from app.core.security import (
+    BoundedExecutor,
+    create_access_token,
+    decode_token_cached,
+    hash_password,
+    jwt_cache_requests,
+    token_cache,
+    verify_password,
+)
 from app.models.librarian import Librarian
+from app.models.revoked_token import RevokedToken
 from app.schemas.librarian import LibrarianIn, TokenOut
 from app.services.librarian_service import authenticate_librarian, register_librarian
+from app.services.token_revocation_service import (
+    RevocationFilter,
+    is_token_revoked,
+    revocation_checks,
+    revocation_filter,
+    revoke_token,
+)
 from fastapi import HTTPException
-from sqlalchemy import delete
+from jose import ExpiredSignatureError, jwt
+from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -89,3 +113,119 @@ async def test_authenticate_librarian_invalid_password(db: AsyncSession):
 
     assert exc_info.value.status_code == 401
     assert exc_info.value.detail == "Invalid credentials"
+
+
+async def test_password_executor_rejects_when_saturated():
+    executor = BoundedExecutor(workers=1, max_pending=1)
+    release = threading.Event()
+
+    running = asyncio.create_task(executor.run(release.wait, 5))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await executor.run(hash_password, "securepass")
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers == {"Retry-After": "1"}
+
+    release.set()
+    assert await running is True
+    assert executor.pending == 0
+
+
+def test_decode_token_cached_skips_verification_until_expiry(monkeypatch):
+    token_cache.clear()
+    token = create_access_token({"user_id": 1})
+    hits = jwt_cache_requests.get(result="hit")
+
+    assert decode_token_cached(token)["user_id"] == 1
+    assert decode_token_cached(token)["user_id"] == 1
+    assert jwt_cache_requests.get(result="hit") == hits + 1
+
+    misses = jwt_cache_requests.get(result="miss")
+    claims = token_cache.get(token)
+    monkeypatch.setattr(time, "time", lambda: claims["exp"] + 1)
+    decode_token_cached(token)
+    assert jwt_cache_requests.get(result="miss") == misses + 1
+
+
+def test_decode_token_cached_does_not_cache_expired_tokens():
+    token_cache.clear()
+    token = jwt.encode(
+        {"user_id": 1, "exp": int(time.time()) - 10},
+        settings.JWT_SECRET_KEY,
+        algorithm=settings.JWT_ALGORITHM,
+    )
+
+    with pytest.raises(ExpiredSignatureError):
+        decode_token_cached(token)
+    assert len(token_cache) == 0
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [f"jti-{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+def test_bloom_filter_counts_distinct_items():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for _ in range(3):
+        bloom.add("jti-1")
+    bloom.add("jti-2")
+
+    assert bloom.count == 2
+
+
+async def test_revoked_token_is_found_after_filter_refresh(db: AsyncSession):
+    expires_at = datetime.now(timezone.utc) + timedelta(minutes=5)
+    absent = revocation_checks.get(result="absent")
+    assert not await is_token_revoked(db, "not-revoked")
+    assert revocation_checks.get(result="absent") == absent + 1
+
+    await revoke_token(db, "revoked-here", expires_at)
+    assert await is_token_revoked(db, "revoked-here")
+
+    # Another worker only sees the revocation once its filter refreshes from the table.
+    other_worker = RevocationFilter(1000, 0.001, refresh_interval=60)
+    await other_worker.refresh(db)
+    assert "revoked-here" in other_worker.bloom
+    await revoke_token(db, "revoked-elsewhere", expires_at)
+    assert "revoked-elsewhere" not in other_worker.bloom
+    await other_worker.refresh(db, force=True)
+    assert "revoked-elsewhere" in other_worker.bloom
+    assert revocation_filter.bloom.count >= 2
+
+
+async def test_revocation_watermark_follows_database_clock(db: AsyncSession):
+    await db.execute(delete(RevokedToken))
+    await db.commit()
+
+    other_worker = RevocationFilter(1000, 0.001, refresh_interval=60)
+    await other_worker.refresh(db)
+    database_now = await db.scalar(select(func.now()))
+    await db.commit()
+    assert other_worker.watermark is not None
+    assert other_worker.watermark <= database_now
+
+    await revoke_token(db, "first-revocation", datetime.now(timezone.utc) + timedelta(minutes=5))
+    await other_worker.refresh(db, force=True)
+    assert "first-revocation" in other_worker.bloom
+
+
+async def test_revocation_refreshes_do_not_recount_the_lookback_window(db: AsyncSession):
+    await db.execute(delete(RevokedToken))
+    await db.commit()
+    await revoke_token(db, "counted-once", datetime.now(timezone.utc) + timedelta(minutes=5))
+
+    other_worker = RevocationFilter(1000, 0.001, refresh_interval=60)
+    for _ in range(5):
+        await other_worker.refresh(db, force=True)
+    other_worker.add("counted-once")
+
+    assert other_worker.bloom.count == 1
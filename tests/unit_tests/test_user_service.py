@@ -1,7 +1,9 @@
 import pytest
+from app.core.pagination import next_cursor
 from app.models.user import User
 from app.schemas.user import UserIn, UserPatch
 from app.services.user_service import (
+    USER_SORT_COLUMNS,
     create_user,
     delete_user,
     get_user_by_id,
@@ -63,6 +65,24 @@ async def test_list_users(db: AsyncSession):
     assert "user2" in usernames
 
 
+async def test_list_users_sorted_by_name_paginated(db: AsyncSession):
+    db.add_all(
+        [
+            User(name="carol", email="carol@example.com"),
+            User(name="alice", email="alice@example.com"),
+            User(name="bob", email="bob@example.com"),
+        ]
+    )
+    await db.commit()
+
+    first_page = await list_users(db, limit=2, sort="name")
+    cursor = next_cursor(first_page, USER_SORT_COLUMNS["name"], sort="name", limit=2)
+    second_page = await list_users(db, limit=2, after=cursor, sort="name")
+
+    assert [user.name for user in first_page] == ["alice", "bob"]
+    assert [user.name for user in second_page] == ["carol"]
+
+
 async def test_create_user_success(db: AsyncSession):
     user_data = UserIn(name="testuser", email="test@example.com")
 